@@ -0,0 +1,73 @@
+"""Benchmark the kana/romaji conversions on all the readings of the local
+subject cache. Run ``hebikani download`` first.
+
+Usage:
+    >>> python benchmarks/bench_kana.py
+"""
+import time
+
+import romkan
+
+from hebikani.input import to_hiragana, to_katakana, to_roma
+from hebikani.settings import load_settings
+
+
+def load_readings():
+    """Load all the readings of the local subject cache.
+
+    Returns:
+        List[str]: The readings.
+    """
+    subjects = load_settings("subjects.json") or []
+    return [
+        reading["reading"]
+        for subject in subjects
+        for reading in subject["data"].get("readings", [])
+    ]
+
+
+def conversions_per_second(convert, values, rounds=5):
+    """Measure the number of conversions per second.
+
+    Args:
+        convert (Callable[[str], str]): The conversion function.
+        values (List[str]): The values to convert.
+        rounds (int): The number of times the values are converted.
+
+    Returns:
+        float: The number of conversions per second.
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            convert(value)
+    return rounds * len(values) / (time.perf_counter() - start)
+
+
+def main():
+    readings = load_readings()
+    if not readings:
+        print("No subject cache found. Run 'hebikani download' first.")
+        return
+
+    romaji = [romkan.to_roma(reading) for reading in readings]
+    print(f"{len(readings)} readings.\n")
+
+    benchmarks = [
+        ("kana -> romaji", romkan.to_roma, to_roma, readings),
+        ("romaji -> hiragana", romkan.to_hiragana, to_hiragana, romaji),
+        ("romaji -> katakana", romkan.to_katakana, to_katakana, romaji),
+    ]
+    for name, uncached, cached, values in benchmarks:
+        cached.cache_clear()
+        romkan_speed = conversions_per_second(uncached, values)
+        cold_speed = conversions_per_second(cached, values, rounds=1)
+        warm_speed = conversions_per_second(cached, values)
+        print(
+            f"{name}: romkan {romkan_speed:,.0f}/s, "
+            f"cold cache {cold_speed:,.0f}/s, warm cache {warm_speed:,.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
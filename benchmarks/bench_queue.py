@@ -0,0 +1,114 @@
+"""Benchmark the question queue on review sessions of 500 subjects.
+
+The session is simulated: 20% of the answers are wrong. The previous
+list-based queue is kept here as a reference.
+
+Usage:
+    >>> python benchmarks/bench_queue.py
+"""
+import random
+import time
+from collections import deque
+
+from hebikani.hebikani import WINDOW_SIZE, QuestionQueue
+
+NB_SUBJECTS = 500
+ERROR_RATE = 0.2
+
+
+class FakeQuestion:
+    """A question without data."""
+
+    def __init__(self, subject, question_type):
+        self.subject = subject
+        self.question_type = question_type
+
+
+class FakeSubject:
+    """A subject with a meaning and a reading question."""
+
+    def __init__(self):
+        self.questions = [FakeQuestion(self, "meaning"), FakeQuestion(self, "reading")]
+
+
+class ListQuestionQueue(list):
+    """The list-based queue used before the deque-based one."""
+
+    def rebuild(self, subjects):
+        queue_subjects = set([question.subject for question in self])
+        i = len(queue_subjects)
+        while i < WINDOW_SIZE and len(subjects) > 0:
+            subject = subjects.pop(0)
+            self.extend(subject.questions)
+            i += 1
+        random.shuffle(self)
+
+    def pop(self):
+        return super().pop(0)
+
+    def requeue(self, question):
+        random.shuffle(self)
+        self.append(question)
+
+
+def run_session(queue, subjects):
+    """Answer all the questions of a session.
+
+    Args:
+        queue: The question queue.
+        subjects: The subjects of the session.
+
+    Returns:
+        int: The number of questions asked.
+    """
+    remaining = {subject: 2 for subject in subjects}
+    nb_questions = 0
+    queue.rebuild(subjects)
+    while queue:
+        question = queue.pop()
+        nb_questions += 1
+        if random.random() < ERROR_RATE:
+            queue.requeue(question)
+            continue
+        remaining[question.subject] -= 1
+        if not remaining[question.subject]:
+            queue.rebuild(subjects)
+    return nb_questions
+
+
+def seconds_per_session(make_queue, make_subjects, rounds=20):
+    """Measure the average duration of a session.
+
+    Args:
+        make_queue (Callable): Create an empty queue.
+        make_subjects (Callable): Create the subjects of a session.
+        rounds (int): The number of sessions.
+
+    Returns:
+        float: The number of seconds per session.
+    """
+    random.seed(0)
+    duration = 0
+    for _ in range(rounds):
+        queue = make_queue()
+        subjects = make_subjects()
+        start = time.perf_counter()
+        run_session(queue, subjects)
+        duration += time.perf_counter() - start
+    return duration / rounds
+
+
+def main():
+    subjects = [FakeSubject() for _ in range(NB_SUBJECTS)]
+    benchmarks = [
+        ("list queue", ListQuestionQueue, lambda: list(subjects)),
+        ("deque queue", QuestionQueue, lambda: deque(subjects)),
+    ]
+    print(f"{NB_SUBJECTS} subjects, {ERROR_RATE:.0%} wrong answers.\n")
+    for name, make_queue, make_subjects in benchmarks:
+        duration = seconds_per_session(make_queue, make_subjects)
+        print(f"{name}: {duration * 1000:.2f} ms per session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the import time of the CLI with ``python -X importtime``.
+
+The slowest packages imported at startup are listed to spot an import that
+should be deferred to the command using it.
+
+Usage:
+    >>> python benchmarks/bench_startup.py
+"""
+import statistics
+import subprocess
+import sys
+
+ROUNDS = 10
+NB_SLOWEST = 10
+
+
+def import_times(module):
+    """Import a module in a new interpreter.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: The depth in the import tree and the
+            cumulative import time in microseconds of each imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            times[name.strip()] = (depth, int(cumulative))
+    return times
+
+
+def main():
+    rounds = [import_times("hebikani.hebikani") for _ in range(ROUNDS)]
+    total = statistics.median(times["hebikani.hebikani"][1] for times in rounds)
+    print(f"hebikani.hebikani: {total / 1000:.1f} ms (median of {ROUNDS})\n")
+
+    # The packages imported by hebikani.hebikani.
+    packages = {
+        name: statistics.median(times.get(name, (1, 0))[1] for times in rounds)
+        for name, (depth, _) in rounds[0].items()
+        if depth == 1
+    }
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    for name, duration in slowest[:NB_SLOWEST]:
+        print(f"{name}: {duration / 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
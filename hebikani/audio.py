@@ -0,0 +1,622 @@
+"""Keep the audio files of the subjects between sessions.
+
+Usage:
+    >>> from hebikani.audio import AudioCache
+    >>> cache = AudioCache("/tmp/hebikani/audio")
+    >>> path = cache.put("https://cdn.wanikani.com/audios/1.mp3", b"ID3", ".mp3")
+    >>> cache.path("https://cdn.wanikani.com/audios/1.mp3") == path
+    True
+"""
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+from urllib.request import pathname2url
+
+import requests
+
+from hebikani.typing import PlayerCommand
+
+# Size limit of the audio cache in bytes.
+MAX_CACHE_SIZE = 200 * 1024 * 1024
+
+# Number of audios downloaded at the same time in the background.
+PREFETCH_WORKERS = 4
+
+# Interval in seconds between two checks of the end of an audio.
+PLAYBACK_POLL_INTERVAL = 0.05
+
+# Size limit of the audios kept in memory in bytes.
+MAX_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Number of playback latencies kept for the statistics.
+MAX_LATENCIES = 100
+
+
+class AudioCache:
+    """Persistent audio cache with a size limit.
+
+    The files are named after the hash of their content. The index maps the
+    audio URLs to their file in least recently used order. When the cache is
+    bigger than its size limit, the least recently used files are deleted.
+    Pinned audios (E.g: downloaded for offline sessions) are never deleted
+    and do not count in the size limit.
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, directory: str, max_size: int = MAX_CACHE_SIZE):
+        """Initialize the audio cache.
+
+        Args:
+            directory (str): The directory of the audio files.
+            max_size (int): The size limit of the cache in bytes.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._pinned = OrderedDict()
+        # Number of URLs using each file.
+        self._files = {}
+        self._size = 0
+        self._unpinned_size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def index(self) -> OrderedDict:
+        """Get the index of the unpinned audios. It is loaded from the disk
+        the first time.
+
+        Returns:
+            OrderedDict: The files and their size per URL from the least
+            recently used to the most recently used.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = OrderedDict()
+                index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+                if os.path.exists(index_path):
+                    with open(index_path) as f:
+                        entries = json.load(f)
+                    for url, entry in entries:
+                        # Ignore the files deleted by the user.
+                        if os.path.exists(os.path.join(self.directory, entry["file"])):
+                            self._add_entry(url, entry)
+            return self._index
+
+    def _entry(self, url: str) -> dict:
+        """Get the index entry of an audio."""
+        return self.index.get(url) or self._pinned.get(url)
+
+    def __contains__(self, url: str) -> bool:
+        return self._entry(url) is not None
+
+    def __len__(self) -> int:
+        return len(self.index) + len(self._pinned)
+
+    def keys(self) -> list:
+        """Get the URLs of the cached audios."""
+        unpinned = list(self.index.keys())
+        return list(self._pinned.keys()) + unpinned
+
+    @property
+    def size(self) -> int:
+        """Get the size of the cached files in bytes."""
+        self.index
+        return self._size
+
+    @property
+    def stats(self) -> dict:
+        """Get the cache statistics.
+
+        Returns:
+            dict: The number of hits, misses, files and bytes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "files": len(self._files),
+            "bytes": self.size,
+        }
+
+    def path(self, url: str) -> str:
+        """Get the path of a cached audio.
+
+        Args:
+            url (str): The URL of the audio.
+
+        Returns:
+            str: The path of the file or None if the audio is not cached.
+        """
+        with self._lock:
+            entry = self._entry(url)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if url in self._index:
+                self._index.move_to_end(url)
+            return os.path.join(self.directory, entry["file"])
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        ext: str,
+        save: bool = True,
+        pinned: bool = False,
+    ) -> str:
+        """Add an audio to the cache.
+
+        Args:
+            url (str): The URL of the audio.
+            content (bytes): The content of the audio.
+            ext (str): The extension of the file.
+            save (bool): Whether to save the index.
+            pinned (bool): Whether the audio must never be deleted.
+
+        Returns:
+            str: The path of the file.
+        """
+        filename = hashlib.sha256(content).hexdigest() + ext
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            if url in self:
+                pinned = pinned or url in self._pinned
+                self._remove_entry(url)
+            if filename not in self._files:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            entry = {"file": filename, "size": len(content)}
+            if pinned:
+                entry["pinned"] = True
+            self._add_entry(url, entry)
+            self.evict()
+            if save:
+                self.save()
+        return path
+
+    def pin(self, url: str) -> bool:
+        """Pin a cached audio so it is never deleted.
+
+        Args:
+            url (str): The URL of the audio.
+
+        Returns:
+            bool: Whether the audio is cached.
+        """
+        with self._lock:
+            if url in self._pinned:
+                return True
+            entry = self.index.pop(url, None)
+            if entry is None:
+                return False
+            self._unpinned_size -= entry["size"]
+            self._pinned[url] = dict(entry, pinned=True)
+            return True
+
+    def evict(self):
+        """Delete the least recently used files until the unpinned audios fit
+        the size limit. The most recently used audio is always kept."""
+        with self._lock:
+            while self._unpinned_size > self.max_size and len(self.index) > 1:
+                url = next(iter(self._index))
+                self._remove_entry(url)
+
+    def save(self):
+        """Save the index on the disk."""
+        with self._lock:
+            if self._index is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+            entries = list(self._pinned.items()) + list(self._index.items())
+            with open(index_path + ".tmp", "w") as f:
+                json.dump(entries, f)
+            os.replace(index_path + ".tmp", index_path)
+
+    def clear(self):
+        """Delete all the cached files and the index."""
+        with self._lock:
+            for url in self.keys():
+                self._remove_entry(url)
+            index_path = os.path.join(self.directory, self.INDEX_FILENAME)
+            if os.path.exists(index_path):
+                os.unlink(index_path)
+
+    def _add_entry(self, url: str, entry: dict):
+        """Add an entry to the index."""
+        if entry.get("pinned"):
+            self._pinned[url] = entry
+        else:
+            self._index[url] = entry
+            self._unpinned_size += entry["size"]
+        if entry["file"] not in self._files:
+            self._files[entry["file"]] = 0
+            self._size += entry["size"]
+        self._files[entry["file"]] += 1
+
+    def _remove_entry(self, url: str):
+        """Remove an entry from the index and delete its file when no other
+        URL uses it."""
+        if url in self._pinned:
+            entry = self._pinned.pop(url)
+        else:
+            entry = self._index.pop(url)
+            self._unpinned_size -= entry["size"]
+        self._files[entry["file"]] -= 1
+        if self._files[entry["file"]] == 0:
+            del self._files[entry["file"]]
+            self._size -= entry["size"]
+            path = os.path.join(self.directory, entry["file"])
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+class AudioPrefetcher:
+    """Download the audios in the background before they are played.
+
+    Usage:
+        >>> prefetcher = AudioPrefetcher()
+        >>> prefetcher.prefetch({audio.url: audio.download for audio in audios})
+        >>> prefetcher.wait(audios[0].url)
+    """
+
+    def __init__(self, max_workers: int = PREFETCH_WORKERS):
+        """Initialize the prefetcher.
+
+        Args:
+            max_workers (int): The number of audios downloaded at the same time.
+        """
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, downloads: Dict[str, Callable]):
+        """Download the audios in the background.
+
+        The pending downloads of the audios that are not requested anymore
+        are cancelled.
+
+        Args:
+            downloads (Dict[str, Callable]): The download function per URL.
+        """
+        with self._lock:
+            for url in list(self._futures):
+                future = self._futures[url]
+                if url not in downloads and (future.cancel() or future.done()):
+                    del self._futures[url]
+
+            for url, download in downloads.items():
+                if url not in self._futures:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(self.max_workers)
+                    self._futures[url] = self._executor.submit(download)
+
+    def pending(self) -> int:
+        """Get the number of audios not downloaded yet."""
+        with self._lock:
+            return sum(1 for future in self._futures.values() if not future.done())
+
+    def wait(self, url: str):
+        """Wait for the background download of an audio.
+
+        A failed download is ignored, the audio is downloaded again by the
+        caller.
+
+        Args:
+            url (str): The URL of the audio.
+        """
+        with self._lock:
+            future = self._futures.pop(url, None)
+        if future is None or future.cancel():
+            return
+        try:
+            future.result()
+        except requests.RequestException:
+            pass
+
+    def shutdown(self):
+        """Cancel the pending downloads."""
+        with self._lock:
+            self._futures.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class AudioBufferPool:
+    """Keep the content of the last downloaded audios in memory so they are
+    played without reading their file. The least recently used audios are
+    dropped when the pool is bigger than its size limit."""
+
+    def __init__(self, max_size: int = MAX_BUFFER_SIZE):
+        """Initialize the pool.
+
+        Args:
+            max_size (int): The size limit of the pool in bytes.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._buffers
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get(self, url: str) -> bytes:
+        """Get the content of an audio.
+
+        Args:
+            url (str): The URL of the audio.
+
+        Returns:
+            bytes: The content of the audio or None if it is not in memory.
+        """
+        with self._lock:
+            content = self._buffers.get(url)
+            if content is not None:
+                self._buffers.move_to_end(url)
+            return content
+
+    def put(self, url: str, content: bytes):
+        """Keep the content of an audio in memory.
+
+        Args:
+            url (str): The URL of the audio.
+            content (bytes): The content of the audio.
+        """
+        with self._lock:
+            if url in self._buffers:
+                self.size -= len(self._buffers.pop(url))
+            self._buffers[url] = content
+            self.size += len(content)
+            while self.size > self.max_size and len(self._buffers) > 1:
+                _, dropped = self._buffers.popitem(last=False)
+                self.size -= len(dropped)
+
+
+class PlaysoundBackend:
+    """Play the audio files with playsound. The playback cannot be
+    interrupted and the audios are always read from their file."""
+
+    def play(self, path: str, started: Callable, content: bytes = None):
+        """Play an audio file until its end.
+
+        Args:
+            path (str): The path of the audio file.
+            started (Callable): Called when the playback starts.
+            content (bytes): The content of the audio. Not supported.
+        """
+        from playsound import playsound
+
+        started()
+        playsound(path)
+
+    def stop(self):
+        """Stop the playback."""
+
+
+class GstBackend:
+    """Play the audio files with a single GStreamer playbin.
+
+    playsound creates a new pipeline for every audio on Linux. The playbin is
+    created once and reused for every audio. The audios in memory are pushed
+    to the playbin through an appsrc element instead of reading their file.
+    """
+
+    def __init__(self):
+        """Initialize GStreamer.
+
+        Raises:
+            ImportError: If GStreamer is not installed.
+            ValueError: If GStreamer is not installed.
+        """
+        import gi
+
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst
+
+        Gst.init(None)
+        self.Gst = Gst
+        self.playbin = Gst.ElementFactory.make("playbin", "playbin")
+        self.playbin.connect("source-setup", self._setup_source)
+        self._content = None
+        self._stop = threading.Event()
+
+    def _setup_source(self, playbin, source):
+        """Push the content of the audio to the appsrc element."""
+        if self._content is not None:
+            source.props.size = len(self._content)
+            source.emit("push-buffer", self.Gst.Buffer.new_wrapped(self._content))
+            source.emit("end-of-stream")
+
+    def play(self, path: str, started: Callable, content: bytes = None):
+        """Play an audio until its end or until it is stopped.
+
+        Args:
+            path (str): The path of the audio file.
+            started (Callable): Called when the playback starts.
+            content (bytes): The content of the audio. The file is used when
+                the audio is not in memory.
+        """
+        Gst = self.Gst
+        self._stop.clear()
+        self._content = content
+        if content is not None:
+            self.playbin.props.uri = "appsrc://"
+        else:
+            self.playbin.props.uri = "file://" + pathname2url(os.path.abspath(path))
+        self.playbin.set_state(Gst.State.PLAYING)
+        self.playbin.get_state(Gst.CLOCK_TIME_NONE)
+        started()
+
+        bus = self.playbin.get_bus()
+        while not self._stop.is_set():
+            message = bus.timed_pop_filtered(
+                int(PLAYBACK_POLL_INTERVAL * Gst.SECOND),
+                Gst.MessageType.EOS | Gst.MessageType.ERROR,
+            )
+            if message:
+                break
+        self.playbin.set_state(Gst.State.NULL)
+
+    def stop(self):
+        """Stop the playback."""
+        self._stop.set()
+
+
+def default_backend():
+    """Get the best audio backend available.
+
+    Returns:
+        GstBackend | PlaysoundBackend: The audio backend.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return GstBackend()
+        except (ImportError, ValueError):
+            pass
+    return PlaysoundBackend()
+
+
+class AudioPlayer:
+    """Play the audios one at a time on a single worker thread.
+
+    The commands are sent to the worker through a queue. Playing an audio
+    interrupts the current one.
+
+    Usage:
+        >>> player = AudioPlayer()
+        >>> player.play("/tmp/audio.mp3")
+        >>> player.replay()
+        >>> player.stop()
+    """
+
+    def __init__(self, backend=None):
+        """Initialize the player.
+
+        Args:
+            backend: The audio backend. Defaults to the best one available.
+        """
+        self.backend = backend
+        self.nb_plays = 0
+        self.latencies = deque(maxlen=MAX_LATENCIES)
+        self._commands = queue.Queue()
+        self._thread = None
+        self._last_audio = (None, None)
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        """Get the playback statistics.
+
+        Returns:
+            dict: The number of plays and the average and maximum time in
+            seconds between a play command and the start of the playback
+            over the last plays.
+        """
+        latencies = list(self.latencies)
+        return {
+            "plays": self.nb_plays,
+            "average_latency": sum(latencies) / len(latencies) if latencies else 0,
+            "max_latency": max(latencies, default=0),
+        }
+
+    def play(self, path: str, content: bytes = None):
+        """Play an audio.
+
+        Args:
+            path (str): The path of the audio file.
+            content (bytes): The content of the audio if it is in memory.
+        """
+        self._send(PlayerCommand.PLAY, path, content)
+
+    def replay(self):
+        """Play the last audio again."""
+        self._send(PlayerCommand.REPLAY)
+
+    def stop(self):
+        """Stop the playback."""
+        if self._thread is not None:
+            self._send(PlayerCommand.STOP)
+
+    def shutdown(self):
+        """Stop the playback and the worker thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            thread = self._thread
+            self._thread = None
+        self._send(PlayerCommand.SHUTDOWN, start=False)
+        thread.join(timeout=1)
+
+    def _send(
+        self,
+        command: PlayerCommand,
+        path: str = None,
+        content: bytes = None,
+        start: bool = True,
+    ):
+        """Send a command to the worker thread. The current playback is
+        interrupted.
+
+        Args:
+            command (PlayerCommand): The command.
+            path (str): The path of the audio file to play.
+            content (bytes): The content of the audio to play.
+            start (bool): Whether to start the worker thread if needed.
+        """
+        with self._lock:
+            if self.backend is None:
+                self.backend = default_backend()
+            if self._thread is None and start:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        # The command is queued first: a playback starting in the meantime is
+        # stopped by the worker since a command is pending.
+        self._commands.put((command, path, content, time.monotonic()))
+        self.backend.stop()
+
+    def _run(self):
+        """Execute the commands until the player is shut down."""
+        while True:
+            command, path, content, requested_at = self._commands.get()
+            if command == PlayerCommand.SHUTDOWN:
+                break
+            if command == PlayerCommand.PLAY:
+                self._last_audio = (path, content)
+            elif command == PlayerCommand.REPLAY:
+                path, content = self._last_audio
+            # Only the last command matters when the user is faster than
+            # the playback.
+            if command == PlayerCommand.STOP or not path or self._commands.qsize():
+                continue
+
+            def started():
+                self.nb_plays += 1
+                self.latencies.append(time.monotonic() - requested_at)
+                # The backend may have been stopped before it started to play.
+                if self._commands.qsize():
+                    self.backend.stop()
+
+            try:
+                self.backend.play(path, started, content)
+            except Exception:
+                # Playing the audio is not critical.
+                pass
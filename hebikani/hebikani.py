@@ -13,55 +13,157 @@ import datetime
 import os
 import random
 import re
-import tempfile
+import sys
 import threading
 import time
-from pytz import utc
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from argparse import ArgumentParser, ArgumentTypeError, RawTextHelpFormatter
+from collections import deque
 from difflib import get_close_matches
+from functools import lru_cache, partial
 from io import BytesIO
-from platform import system
 from signal import SIGINT, signal
-from typing import List
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Tuple
 
-
-import ascii_magic
 import requests
-import romkan
-from cairosvg import svg2png
 from colorama import Back, Fore, Style
-from PIL import Image, ImageOps
-from playsound import playsound
 
 from hebikani import __version__
+from hebikani.audio import (
+    AudioBufferPool,
+    AudioCache,
+    AudioPlayer,
+    AudioPrefetcher,
+)
 from hebikani.graph import hist
-from hebikani.input import getch, input_kana
+from hebikani.input import RawInput, input_kana, to_roma
+from hebikani.screen import Screen, ask, echo
 from hebikani.typing import (
     AnswerType,
     Gender,
     HTTPMethod,
+    Key,
+    MarkupMode,
     QuestionType,
+    ReviewOrder,
     SubjectObject,
     VoiceMode,
 )
-from hebikani.settings import load_settings, save_settings, setting_creation_date
-from halo import Halo
+from hebikani.settings import (
+    get_settings_path,
+    load_settings,
+    save_settings,
+    setting_creation_date,
+)
 
-if system() == "Windows":
-    from mutagen.mp3 import MP3
+# The packages used by a few commands only are imported when they are needed
+# to start the CLI faster. E.g: `hebikani summary` does not render radicals.
+if TYPE_CHECKING:
+    from halo import Halo
+    from PIL import Image
 
 API_URL = "https://api.wanikani.com/v2/"
 MIN_NB_SUBJECTS = 1
 MAX_NB_SUJECTS = 500
+MAX_LEVEL = 60
 
 # Number of subjects inside a session queue at once.
-MAX_QUEUE_SIZE = 10
+WINDOW_SIZE = 10
+MIN_WINDOW_SIZE = 3
+MAX_WINDOW_SIZE = 30
+
+# Number of subjects shown at once during lessons.
+LESSON_BATCH_SIZE = 3
+
+# The adaptive window grows when the accuracy of the last answers is high
+# and shrinks after a streak of wrong answers.
+WINDOW_ACCURACY_ANSWERS = 10
+WINDOW_GROWTH_ACCURACY = 0.9
+WINDOW_SHRINK_ERRORS = 3
+
+# Estimated review time of a subject before a subject of the session is done.
+DEFAULT_SECONDS_PER_SUBJECT = 30
+MAX_MINUTES = 240
+
+# Colors of the text inside the WaniKani tags of the mnemonics.
+TAG_STYLES = {
+    tag: Style.BRIGHT + Fore.WHITE + background
+    for tag, background in [
+        ("kanji", Back.RED),
+        ("vocabulary", Back.MAGENTA),
+        ("radical", Back.BLUE),
+        ("ja", Back.GREEN),
+        ("reading", Back.CYAN),
+        ("meaning", Back.CYAN),
+    ]
+}
+TAG_RESET = Back.RESET + Fore.RESET + Style.RESET_ALL
+
+# Opening or closing tag. E.g: <kanji>, </kanji> or <a href="...">.
+WANIKANI_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^<>]*>")
+
+# Number of mnemonics kept in memory once converted to colors.
+MARKUP_CACHE_SIZE = 4096
 
 # Ratio when using difflib.get_close_matches()
 RATIO_CLOSE_MATCHES = 0.8
 
-# Cache audio during session to avoid redownloading the same audio
-audio_cache = {}
+# Number of parallel requests when preparing a session.
+MAX_WORKERS = 8
+
+# Maximum number of subjects per page returned by the API.
+SUBJECTS_PER_PAGE = 1000
+
+# Widths of the radical ascii art. The widest one fitting the terminal, with
+# ASCII_MARGIN_ROWS rows for the header and the prompt, is used.
+ASCII_WIDTHS = (32, 48, 64, 96)
+
+# Width of the radical ascii art when the terminal size is unknown.
+ASCII_COLUMNS = 64
+
+# Width of a character divided by its height. Used by ascii_magic.
+ASCII_WIDTH_RATIO = 2.2
+
+# Rows around the radical ascii art for the header and the prompt.
+ASCII_MARGIN_ROWS = 8
+
+# Subject objects in the order of the type-grouped reviews.
+SUBJECT_OBJECTS = [
+    SubjectObject.RADICAL,
+    SubjectObject.KANJI,
+    SubjectObject.VOCABULARY,
+    SubjectObject.KANA_VOCABULARY,
+]
+
+# Number of audios downloaded at the same time for offline sessions.
+AUDIO_DOWNLOAD_WORKERS = 4
+
+# Number of downloaded audios between two saves of the audio cache index.
+AUDIO_INDEX_SAVE_INTERVAL = 100
+
+# Keep the audios between sessions to avoid redownloading the same audio
+audio_cache = AudioCache(os.path.join(get_settings_path("hebikani"), "audio"))
+
+# Download the audios of the upcoming questions in the background
+audio_prefetcher = AudioPrefetcher()
+
+# Keep the last downloaded audios in memory to play them without their file
+audio_buffers = AudioBufferPool()
+
+# Play the audios on a single worker thread
+audio_player = AudioPlayer()
+
+# Cache radical images during session to avoid redownloading the same image
+image_cache = {}
+
+# Render the radical ascii arts in the background
+ascii_renderer = ThreadPoolExecutor(1)
+
+# Background renders of the radical ascii arts per image url
+ascii_renders = {}
+
+# Draw the session screens
+screen = Screen()
 
 
 def api_request(
@@ -90,7 +192,7 @@ def api_request(
 
     if modified_since:
         # Convert to UTC
-        modified_since = modified_since.astimezone(utc)
+        modified_since = modified_since.astimezone(datetime.timezone.utc)
         headers["If-Modified-Since"] = modified_since.strftime(
             "%a, %d %b %Y %H:%M:%S GMT"
         )
@@ -109,21 +211,142 @@ def api_request(
     return resp.json()
 
 
-def url_to_ascii(url: str):
-    """Uses ascii_magic to generate an ascii art image from an image downloaded
-    from a URL.
+def remove_metadata(content: bytes) -> bytes:
+    """Remove the metadata of a mp3 in memory.
+
+    Args:
+        content (bytes): The content of the mp3.
+
+    Returns:
+        bytes: The content without metadata.
+    """
+    from mutagen.mp3 import MP3
+
+    f = BytesIO(content)
+    MP3(f).delete(f)
+    return f.getvalue()
+
+
+def download_image(url: str) -> bytes:
+    """Download an image unless it is cached.
+
+    Args:
+        url (str): The url of the image.
+
+    Returns:
+        bytes: The content of the image.
+    """
+    if url not in image_cache:
+        response = requests.get(url)
+        response.raise_for_status()
+        image_cache[url] = response.content
+    return image_cache[url]
+
+
+def ascii_height(width: int) -> int:
+    """Get the number of rows of an ascii art.
+
+    Args:
+        width (int): The number of columns of the ascii art.
+
+    Returns:
+        int: The number of rows.
+    """
+    return int(width / ASCII_WIDTH_RATIO)
+
+
+def ascii_width() -> int:
+    """Get the widest ascii art width that fits in the terminal with the
+    header and the prompt.
+
+    Returns:
+        int: The number of columns of the ascii art.
+    """
+    try:
+        size = os.get_terminal_size()
+    except OSError:
+        return ASCII_COLUMNS
+    fitting_widths = [
+        width
+        for width in ASCII_WIDTHS
+        if width <= size.columns
+        and ascii_height(width) + ASCII_MARGIN_ROWS <= size.lines
+    ]
+    return max(fitting_widths, default=min(ASCII_WIDTHS))
+
+
+def url_to_ascii(url: str, columns: int = None) -> str:
+    """Get the ascii art of an image. The ascii art is rendered once in every
+    width and saved for the next sessions.
+
     Args:
         url (str): The url of the image we want to convert to ascii art.
+        columns (int): The width of the ascii art. Defaults to the widest
+            width that fits in the terminal.
+
+    Returns:
+        str: The ascii art.
+    """
+    columns = columns or ascii_width()
+    ascii_art = Cache.get_ascii_art(url, columns)
+    if ascii_art is None:
+        widths = ASCII_WIDTHS if columns in ASCII_WIDTHS else (columns,)
+        for width, ascii_art in render_ascii(url, widths).items():
+            Cache.set_ascii_art(url, width, ascii_art, save=False)
+        Cache.save_ascii_arts()
+        ascii_art = Cache.get_ascii_art(url, columns)
+    return ascii_art
+
+
+def render_ascii_async(url: str) -> Future:
+    """Render the ascii art of an image in the background. A failed render
+    is started again.
+
+    Args:
+        url (str): The url of the image.
+
+    Returns:
+        Future: The render.
     """
-    request = requests.get(url)
+    future = ascii_renders.get(url)
+    if future is None or (future.done() and future.exception()):
+        future = ascii_renderer.submit(url_to_ascii, url)
+        ascii_renders[url] = future
+    return future
+
+
+def render_ascii(url: str, widths: Iterable[int] = ASCII_WIDTHS) -> Dict[int, str]:
+    """Uses ascii_magic to generate ascii art images from an image downloaded
+    from a URL. The image is rasterized once for all the widths.
+
+    Args:
+        url (str): The url of the image we want to convert to ascii art.
+        widths (Iterable[int]): The widths of the ascii arts.
+
+    Returns:
+        Dict[int, str]: The ascii art per width.
+    """
+    image = rasterize_svg(download_image(url))
+    return {width: image_to_ascii(image, width) for width in widths}
+
+
+def rasterize_svg(svg: bytes) -> "Image.Image":
+    """Convert a black svg image to a white image on a black background.
+
+    Args:
+        svg (bytes): The svg image.
+
+    Returns:
+        Image.Image: The image.
+    """
+    from cairosvg import svg2png
+    from PIL import Image, ImageOps
 
     # Convert svg to png
     downloaded_image_file = BytesIO()
 
     # CairoSVG did not like the #000 color in the svg
-    content = (
-        request.content.decode("utf-8").replace("#000", "rgb(0,0,0)").encode("utf-8")
-    )
+    content = svg.decode("utf-8").replace("#000", "rgb(0,0,0)").encode("utf-8")
 
     svg2png(bytestring=content, write_to=downloaded_image_file)
 
@@ -133,54 +356,121 @@ def url_to_ascii(url: str):
     # Create a white rgba background
     image = Image.new("RGBA", downloaded_image.size, "white")
     image.paste(downloaded_image, (0, 0), downloaded_image)
-    image = ImageOps.invert(image.convert("RGB"))
+    return ImageOps.invert(image.convert("RGB"))
 
-    ascii_art = ascii_magic.from_image(image, columns=64)
-    f = open("ascii.txt", "w")
-    f.write(ascii_art)
-    f.close()
-    return ascii_art
+
+def image_to_ascii(image: "Image.Image", columns: int = ASCII_COLUMNS) -> str:
+    """Convert an image to ascii art.
+
+    Args:
+        image (Image.Image): The image.
+        columns (int): The width of the ascii art.
+
+    Returns:
+        str: The ascii art.
+    """
+    import ascii_magic
+
+    return ascii_magic.from_image(image, columns=columns)
 
 
-def wanikani_tag_to_color(text: str) -> str:
-    """Convert a WaniKani tag to a color.
+def render_svg(
+    svg: bytes, widths: Iterable[int] = ASCII_WIDTHS
+) -> Tuple[Dict[int, str], float, float]:
+    """Render a svg image to ascii art in every width. Meant to run in a
+    worker process.
+
+    Args:
+        svg (bytes): The svg image.
+        widths (Iterable[int]): The widths of the ascii arts.
+
+    Returns:
+        Tuple[Dict[int, str], float, float]: The ascii art per width and the
+        time spent to rasterize and to convert the image in seconds.
+    """
+    start = time.perf_counter()
+    image = rasterize_svg(svg)
+    rasterized = time.perf_counter()
+    ascii_arts = {width: image_to_ascii(image, width) for width in widths}
+    return ascii_arts, rasterized - start, time.perf_counter() - rasterized
+
+
+@lru_cache(maxsize=MARKUP_CACHE_SIZE)
+def wanikani_tag_to_color(text: str, mode: MarkupMode = MarkupMode.ANSI) -> str:
+    """Convert the WaniKani tags of a text to colors in a single pass. The
+    conversions are cached.
+
+    A tag nested in another one gets its own color and the color of the
+    outer tag is restored when it is closed. The unknown tags are removed.
 
     Args:
         text (str): The text to convert.
+        mode (MarkupMode): Whether to color the tagged text, to put it between
+            brackets or to only remove the tags.
 
     Returns:
         str: The colorized text.
     """
-    tag_colors = {
-        "kanji": Back.RED,
-        "vocabulary": Back.MAGENTA,
-        "radical": Back.BLUE,
-        "ja": Back.GREEN,
-        "reading": Back.CYAN,
-        "meaning": Back.CYAN,
-    }
-    for tag, bg_color in tag_colors.items():
-        text = text.replace(f"<{tag}>", Style.BRIGHT + Fore.WHITE + bg_color)
-        text = text.replace(f"</{tag}>", Back.RESET + Fore.RESET + Style.RESET_ALL)
+    reset = TAG_RESET if mode == MarkupMode.ANSI else ""
+    opened_tags = []
+
+    def replace(match: re.Match) -> str:
+        closing, tag = match.groups()
+        if tag not in TAG_STYLES:
+            return ""
+        if not closing:
+            opened_tags.append(tag)
+            if mode == MarkupMode.ANSI:
+                return TAG_STYLES[tag]
+            return "[" if mode == MarkupMode.PLAIN else ""
+        if tag not in opened_tags:
+            return ""
+
+        # Close the tags left open inside the closed one.
+        while opened_tags.pop() != tag:
+            pass
+        if mode == MarkupMode.ANSI:
+            return TAG_STYLES[opened_tags[-1]] if opened_tags else reset
+        return "]" if mode == MarkupMode.PLAIN else ""
+
+    text = WANIKANI_TAG.sub(replace, text)
+    if opened_tags:
+        text += "]" * len(opened_tags) if mode == MarkupMode.PLAIN else reset
     return text
 
 
+def create_spinner(text: str) -> "Halo":
+    """Create a spinner. halo is imported with the first spinner.
+
+    Args:
+        text (str): The text next to the spinner.
+
+    Returns:
+        Halo: The spinner, not started.
+    """
+    from halo import Halo
+
+    return Halo(text=text, spinner="dots")
+
+
 def clear_terminal():
-    """Clear the terminal."""
-    os.system("cls" if os.name == "nt" else "clear")
+    """Clear the terminal with ANSI escape sequences."""
+    screen.clear()
 
 
-def clear_audio_cache():
-    """Clear the audio cache."""
-    for audio_file in audio_cache.values():
-        os.unlink(audio_file.name)
+def close_audio():
+    """Stop the background downloads and the playback and save the audio
+    cache index."""
+    audio_prefetcher.shutdown()
+    audio_player.shutdown()
+    audio_cache.save()
 
 
 def handler(signal_received=None, frame=None):
     """Terminate the program gracefully."""
     clear_terminal()
     print("Program was terminated by user.\n\n")
-    clear_audio_cache()
+    close_audio()
     exit(1)
 
 
@@ -213,6 +503,11 @@ def utc_to_local(utc: datetime.datetime) -> datetime.datetime:
 
 class Cache:
     subjects = {}
+    meaning_synonyms = {}
+    # Radical ascii art per "<columns> <image url>". Loaded from the disk.
+    ascii_arts = None
+    # The ascii arts are rendered in the background and saved from any thread.
+    ascii_arts_lock = threading.RLock()
     client = None
 
     @classmethod
@@ -227,8 +522,62 @@ class Cache:
 
     @classmethod
     def set_subject(cls, subject):
+        subject.meaning_synonyms = cls.meaning_synonyms.get(subject.id, [])
         cls.subjects[subject.id] = subject
 
+    @classmethod
+    def set_study_material(cls, study_material: dict):
+        """Keep the user's meaning synonyms of a study material.
+
+        Args:
+            study_material (dict): The study material data from the API.
+        """
+        data = study_material["data"]
+        cls.meaning_synonyms[data["subject_id"]] = data.get("meaning_synonyms", [])
+
+    @classmethod
+    def get_ascii_art(cls, url: str, columns: int) -> str:
+        """Get the ascii art of an image rendered in a previous session.
+
+        Args:
+            url (str): The url of the image.
+            columns (int): The width of the ascii art.
+
+        Returns:
+            str: The ascii art or None if it was never rendered.
+        """
+        with cls.ascii_arts_lock:
+            return cls._load_ascii_arts().get(f"{columns} {url}")
+
+    @classmethod
+    def set_ascii_art(cls, url: str, columns: int, ascii_art: str, save=True):
+        """Keep the ascii art of an image and save it for the next sessions.
+
+        Args:
+            url (str): The url of the image.
+            columns (int): The width of the ascii art.
+            ascii_art (str): The ascii art.
+            save (bool): Whether to save the ascii arts on the disk.
+        """
+        with cls.ascii_arts_lock:
+            cls._load_ascii_arts()[f"{columns} {url}"] = ascii_art
+            if save:
+                cls.save_ascii_arts()
+
+    @classmethod
+    def save_ascii_arts(cls):
+        """Save the ascii arts for the next sessions."""
+        with cls.ascii_arts_lock:
+            save_settings("radicals.json", cls._load_ascii_arts())
+
+    @classmethod
+    def _load_ascii_arts(cls) -> dict:
+        """Load the ascii arts saved by the previous sessions once."""
+        with cls.ascii_arts_lock:
+            if cls.ascii_arts is None:
+                cls.ascii_arts = load_settings("radicals.json") or {}
+            return cls.ascii_arts
+
 
 class ClientOptions:
     """Client options."""
@@ -244,6 +593,13 @@ class ClientOptions:
         display_mnemonics: bool = False,
         double_check: bool = False,
         test_ids: list = None,
+        download_audio: bool = False,
+        levels: Tuple[int, int] = None,
+        download_radicals: bool = False,
+        order: ReviewOrder = ReviewOrder.RANDOM,
+        window_size: int = WINDOW_SIZE,
+        adaptive_window: bool = False,
+        minutes: int = None,
     ):
         """Initialize the client options.
 
@@ -255,6 +611,19 @@ class ClientOptions:
             dry_run (bool): Whether to run in dry run mode.
             limit (int): The number of subjects to review.
             display_mnemonics (bool): Whether to display mnemonics.
+            download_audio (bool): Whether to download the audios when
+                downloading the subjects.
+            levels (Tuple[int, int]): The first and last levels of the
+                downloaded audios.
+            download_radicals (bool): Whether to render the radical images
+                when downloading the subjects.
+            order (ReviewOrder): The order of the subjects in the sessions.
+            window_size (int): The number of subjects in the review queue
+                at once.
+            adaptive_window (bool): Whether to adapt the window size to the
+                accuracy of the answers.
+            minutes (int): The duration of the review sessions. No subject
+                is added once the session would not end in time.
         """
         self.autoplay = autoplay
         self.silent = silent
@@ -265,6 +634,13 @@ class ClientOptions:
         self.display_mnemonics = display_mnemonics
         self.double_check = double_check
         self.test_ids = test_ids
+        self.download_audio = download_audio
+        self.levels = levels
+        self.download_radicals = download_radicals
+        self.order = order
+        self.window_size = window_size
+        self.adaptive_window = adaptive_window
+        self.minutes = minutes
 
 
 class Client:
@@ -288,10 +664,17 @@ class Client:
         Cache.client = self
 
     def _load_subject_cache(self):
-        """Load the subject cache."""
+        """Load the subject cache.
+
+        The study materials are loaded first so the user's meaning synonyms
+        are merged into the subjects when they are added to the cache.
+        """
+        for study_material in load_settings("study_materials.json") or []:
+            Cache.set_study_material(study_material)
+
         subjects = load_settings("subjects.json")
         if subjects:
-            spinner = Halo(text="Loading cache", spinner="dots")
+            spinner = create_spinner("Loading cache")
             spinner.start()
             for subject in subjects:
                 Cache.set_subject(Subject(subject))
@@ -315,7 +698,9 @@ class Client:
         subject_ids = (
             self.options.test_ids if self.options.test_ids else self.summary().reviews
         )
-        subjects = self._subject_per_ids(subject_ids)
+        subjects = self._order_subjects(self._subject_per_ids(subject_ids))
+        first_window = subjects[: self.options.limit][: self.options.window_size]
+        self._prepare_session(subjects, audio_subjects=first_window)
         session = ReviewSession(self, subjects)
         session.start()
 
@@ -326,85 +711,359 @@ class Client:
             self.options.test_ids if self.options.test_ids else self.summary().lessons
         )
         subjects = self._subject_per_ids(subject_ids)
+        self._prepare_session(
+            subjects, components=True, audio_subjects=subjects[:LESSON_BATCH_SIZE]
+        )
         session = LessonSession(self, subjects)
         session.start()
 
     def download(self):
         """Download data from the WaniKani API to have them offline."""
+        self._download_collection("subjects", "subject")
+        self._download_collection("study_materials", "study material")
+        if self.options.download_audio:
+            self._download_audios()
+        if self.options.download_radicals:
+            self._download_radicals()
+
+    def _download_collection(self, endpoint: str, name: str):
+        """Download a collection from the WaniKani API and merge it with
+        the one saved locally.
+
+        Args:
+            endpoint (str): The collection endpoint (E.g: subjects).
+            name (str): The singular name of the items to display.
+        """
+        filename = f"{endpoint}.json"
         # Check if the data is already cached
-        subjects = load_settings("subjects.json")
-        creation_date = setting_creation_date("subjects.json")
+        items = load_settings(filename)
+        creation_date = setting_creation_date(filename)
         if creation_date:
             date_str = creation_date.strftime("%a, %d %b %Y %H:%M:%S")
             print(
-                f"Subject data already cached. (Created on {date_str}).\n"
+                f"{name.capitalize()} data already cached. (Created on {date_str}).\n"
                 "Only downloading new data."
             )
 
-        spinner = Halo(text="Downloading", spinner="dots")
+        spinner = create_spinner("Downloading")
         spinner.start()
-        subject_data = api_request(
-            HTTPMethod.GET, "subjects", self.api_key, modified_since=creation_date
+        collection = api_request(
+            HTTPMethod.GET, endpoint, self.api_key, modified_since=creation_date
         )
-        if not subject_data:
+        if not collection:
             spinner.stop()
-            print("No new data to download.")
+            print(f"No new {name} data to download.")
             return
 
-        new_subjects = [d for d in subject_data["data"]]
-        while subject_data["pages"]["next_url"]:
-            subject_data = api_request(
-                HTTPMethod.GET, subject_data["pages"]["next_url"], self.api_key
+        new_items = [d for d in collection["data"]]
+        while collection["pages"]["next_url"]:
+            collection = api_request(
+                HTTPMethod.GET, collection["pages"]["next_url"], self.api_key
             )
-            new_subjects += [d for d in subject_data["data"]]
-            spinner.text = f"Downloading {len(new_subjects)} subjects"
+            new_items += [d for d in collection["data"]]
+            spinner.text = f"Downloading {len(new_items)} {name}s"
 
         spinner.stop()
 
-        print(f"Downloaded {len(new_subjects)} subjects.")
+        print(f"Downloaded {len(new_items)} {name}s.")
 
-        if not subjects:
-            subjects = new_subjects
+        if not items:
+            items = new_items
         else:
             # Replace old data when new data is available
             nb_added = 0
             nb_modified = 0
-            # Create a dict with the subject ids as keys
-            # To avoid looping over the list of subjects
-            subject_ids_index = {s["id"]: i for i, s in enumerate(subjects)}
-            for new_subject in new_subjects:
-                i = subject_ids_index.get(new_subject["id"])
+            # Create a dict with the ids as keys
+            # To avoid looping over the list of items
+            item_ids_index = {s["id"]: i for i, s in enumerate(items)}
+            for new_item in new_items:
+                i = item_ids_index.get(new_item["id"])
                 if i is None:
-                    subjects.append(new_subject)
+                    items.append(new_item)
                     nb_added += 1
                 else:
-                    subjects[i] = new_subject
+                    items[i] = new_item
                     nb_modified += 1
 
-            print(f"Added {nb_added} subjects.")
-            print(f"Modified {nb_modified} subjects.")
+            print(f"Added {nb_added} {name}s.")
+            print(f"Modified {nb_modified} {name}s.")
 
         # Save the data
-        save_settings("subjects.json", subjects)
+        save_settings(filename, items)
+
+    def _download_audios(self):
+        """Download the audios of the local subjects for offline sessions.
+
+        The audios already downloaded are skipped so an interrupted download
+        resumes where it stopped. The audios are pinned in the audio cache:
+        they are never deleted.
+        """
+        subjects = [Subject(s) for s in load_settings("subjects.json") or []]
+        if self.options.levels:
+            first, last = self.options.levels
+            subjects = [s for s in subjects if first <= s.level <= last]
+
+        voice_mode = self.options.voice_mode
+        audios = {}
+        for subject in subjects:
+            if voice_mode in [VoiceMode.FEMALE, VoiceMode.MALE]:
+                subject_audios = subject.audios_by_gender[voice_mode]
+            else:
+                subject_audios = subject.audios
+            for audio in subject_audios:
+                audios[audio.url] = audio
+        missing = [audio for url, audio in audios.items() if not audio_cache.pin(url)]
+        print(f"{len(audios) - len(missing)} audios already downloaded.")
+
+        spinner = create_spinner("Downloading audios")
+        spinner.start()
+        nb_failed = 0
+        with ThreadPoolExecutor(AUDIO_DOWNLOAD_WORKERS) as executor:
+            futures = [
+                executor.submit(audio._download, pinned=True) for audio in missing
+            ]
+            for i, future in enumerate(as_completed(futures), start=1):
+                spinner.text = f"Downloading audios {i}/{len(futures)}"
+                try:
+                    future.result()
+                except requests.RequestException:
+                    nb_failed += 1
+                if i % AUDIO_INDEX_SAVE_INTERVAL == 0:
+                    audio_cache.save()
+        audio_cache.save()
+        spinner.stop()
+
+        print(f"Downloaded {len(missing) - nb_failed} audios.")
+        if nb_failed:
+            print(f"{nb_failed} audios failed. Run the command again to resume.")
+
+    def _download_radicals(self):
+        """Render the ascii art of the radicals without characters.
+
+        The images are downloaded in parallel and rendered in worker
+        processes. The time spent in each stage is displayed.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        subjects = [Subject(s) for s in load_settings("subjects.json") or []]
+        urls = {s.image_url for s in subjects if s.image_url}
+        missing = [
+            url
+            for url in urls
+            if any(Cache.get_ascii_art(url, w) is None for w in ASCII_WIDTHS)
+        ]
+        print(f"{len(urls) - len(missing)} radicals already rendered.")
+
+        spinner = create_spinner("Downloading radical images")
+        spinner.start()
+        nb_rendered = 0
+        try:
+            start = time.perf_counter()
+            images = {}
+            with ThreadPoolExecutor(MAX_WORKERS) as executor:
+                futures = {executor.submit(download_image, url): url for url in missing}
+                for future in as_completed(futures):
+                    try:
+                        images[futures[future]] = future.result()
+                    except requests.RequestException:
+                        pass
+            fetch_time = time.perf_counter() - start
+
+            spinner.text = "Rendering radicals"
+            start = time.perf_counter()
+            rasterize_time = 0
+            convert_time = 0
+            with ProcessPoolExecutor() as executor:
+                futures = {
+                    executor.submit(render_svg, image, ASCII_WIDTHS): url
+                    for url, image in images.items()
+                }
+                for i, future in enumerate(as_completed(futures), start=1):
+                    spinner.text = f"Rendering radicals {i}/{len(futures)}"
+                    try:
+                        ascii_arts, rasterize, convert = future.result()
+                    except Exception:
+                        # The radical is rendered again on the next run.
+                        continue
+                    nb_rendered += 1
+                    rasterize_time += rasterize
+                    convert_time += convert
+                    for width, ascii_art in ascii_arts.items():
+                        Cache.set_ascii_art(futures[future], width, ascii_art, False)
+            render_time = time.perf_counter() - start
+        finally:
+            # Keep the radicals rendered before an error or Ctrl-C.
+            Cache.save_ascii_arts()
+            spinner.stop()
+
+        print(f"Downloaded {len(images)}/{len(missing)} images in {fetch_time:.2f}s.")
+        print(
+            f"Rendered {nb_rendered} radicals in {render_time:.2f}s "
+            f"(rasterize: {rasterize_time:.2f}s, convert: {convert_time:.2f}s "
+            "of worker time)."
+        )
+        nb_failed = len(missing) - nb_rendered
+        if nb_failed:
+            print(f"{nb_failed} radicals failed. Run the command again to resume.")
+
+    def _prepare_session(
+        self,
+        subjects: List["Subject"],
+        components: bool = False,
+        audio_subjects: List["Subject"] = None,
+    ):
+        """Fetch everything the session needs before it starts so the session
+        only makes requests to submit the answers.
+
+        The missing subjects are fetched in bulk. The radical images and the
+        audios of the first subjects shown are downloaded in parallel. The
+        other audios are downloaded in the background during the session.
+        The kanji of single kanji vocabularies are attached to their
+        vocabulary so checking an answer never makes a request.
+
+        Args:
+            subjects (List[Subject]): The subjects of the session.
+            components (bool): Whether to fetch the component subjects
+                displayed during lessons.
+            audio_subjects (List[Subject]): The subjects shown first whose
+                audios are downloaded.
+        """
+        spinner = create_spinner("Preparing session")
+        spinner.start()
+        try:
+            subject_ids = set()
+            for subject in subjects:
+                if subject.auxiliary_subject_id:
+                    subject_ids.add(subject.auxiliary_subject_id)
+                if components:
+                    subject_ids.update(subject.component_subject_ids)
+            if subject_ids:
+                self._subject_per_ids(list(subject_ids))
+
+            for subject in subjects:
+                if subject.auxiliary_subject_id:
+                    subject.set_auxiliary_subject(
+                        Cache.subjects.get(subject.auxiliary_subject_id)
+                    )
+
+            displayed_subjects = list(subjects)
+            if components:
+                displayed_subjects += [
+                    Cache.subjects[i] for i in subject_ids if i in Cache.subjects
+                ]
+
+            downloads = {}
+            for subject in displayed_subjects:
+                if subject.image_url:
+                    downloads[subject.image_url] = partial(
+                        download_image, subject.image_url
+                    )
+            for subject in audio_subjects or []:
+                for audio in self._session_audios(subject):
+                    if audio.url not in audio_cache:
+                        downloads[audio.url] = audio.download
+
+            with ThreadPoolExecutor(MAX_WORKERS) as executor:
+                futures = [executor.submit(download) for download in downloads.values()]
+                for i, future in enumerate(as_completed(futures), start=1):
+                    spinner.text = f"Preparing session {i}/{len(futures)}"
+                    try:
+                        future.result()
+                    except requests.RequestException:
+                        # The download will be retried when it is needed.
+                        pass
+        finally:
+            spinner.stop()
+
+    def _session_audios(self, subject: "Subject") -> List["Audio"]:
+        """Get the audios of a subject that may be played during a session.
+
+        Args:
+            subject (Subject): The subject.
+
+        Returns:
+            List[Audio]: The audios matching the voice mode.
+        """
+        if self.options.silent:
+            return []
+        if self.options.voice_mode in [VoiceMode.FEMALE, VoiceMode.MALE]:
+            return subject.audios_by_gender[self.options.voice_mode]
+        return subject.audios
 
     def _subject_per_ids(self, subject_ids: List[int]):
         """Get subjects by ID.
 
+        The subjects missing from the cache are fetched by pages in parallel.
+
         Args:
             subject_ids (List[int]): A list of subject IDs to get.
         """
         # Remove subjects that are already in the cache
         missing_ids = list(set(subject_ids) - set(Cache.subjects.keys()))
         if missing_ids:
-            ids = ",".join(str(i) for i in missing_ids)
-            data = api_request(HTTPMethod.GET, f"subjects?ids={ids}", self.api_key)
-
-            for data in data["data"]:
-                subject = Subject(data)
-                Cache.set_subject(subject)
+            with ThreadPoolExecutor(MAX_WORKERS) as executor:
+                pages = executor.map(
+                    lambda ids: api_request(
+                        HTTPMethod.GET,
+                        f"subjects?ids={','.join(str(i) for i in ids)}",
+                        self.api_key,
+                    ),
+                    chunks(missing_ids, SUBJECTS_PER_PAGE),
+                )
+                for page in pages:
+                    for data in page["data"]:
+                        Cache.set_subject(Subject(data))
 
         return [Cache.get_subject(i) for i in subject_ids]
 
+    def _order_subjects(self, subjects: List["Subject"]) -> List["Subject"]:
+        """Sort the subjects of a review session with the review order.
+
+        The sort keys are computed once. Subjects with the same key keep the
+        order of the summary.
+
+        Args:
+            subjects (List[Subject]): The subjects.
+
+        Returns:
+            List[Subject]: The sorted subjects.
+        """
+        order = self.options.order
+        assignments = {}
+        if order in [ReviewOrder.SRS, ReviewOrder.OLDEST]:
+            assignments = self._available_assignments()
+
+        def assignment(subject):
+            return assignments.get(subject.id, {"srs_stage": 0, "available_at": ""})
+
+        sort_keys = {
+            ReviewOrder.SRS: lambda s: (
+                assignment(s)["srs_stage"],
+                assignment(s)["available_at"],
+            ),
+            ReviewOrder.LEVEL: lambda s: s.level,
+            ReviewOrder.OLDEST: lambda s: assignment(s)["available_at"],
+            ReviewOrder.TYPE: lambda s: (SUBJECT_OBJECTS.index(s.object), s.level),
+        }
+        if order not in sort_keys:
+            return subjects
+        return sorted(subjects, key=sort_keys[order])
+
+    def _available_assignments(self) -> Dict[int, dict]:
+        """Get the assignments available for review.
+
+        Returns:
+            Dict[int, dict]: The assignment data per subject ID.
+        """
+        assignments = {}
+        endpoint = "assignments?immediately_available_for_review=true"
+        while endpoint:
+            collection = api_request(HTTPMethod.GET, endpoint, self.api_key)
+            for assignment in collection["data"]:
+                assignments[assignment["data"]["subject_id"]] = assignment["data"]
+            endpoint = collection["pages"]["next_url"]
+        return assignments
+
     def _assignment_id_per_subject_id(self, subject_id: int) -> int:
         """Get assignments by subject ID.
 
@@ -460,29 +1119,47 @@ class Audio(APIObject):
 
         return _gender
 
-    def download(self):
-        """Download the audio if not cached."""
-        if self.url not in audio_cache.keys():
+    def download(self) -> str:
+        """Download the audio if not cached. If the audio is being downloaded
+        in the background, wait for it.
+
+        Returns:
+            str: The path of the audio file.
+        """
+        audio_prefetcher.wait(self.url)
+        return self._download()
+
+    def _download(self, pinned: bool = False) -> str:
+        """Download the audio if not cached.
+
+        Args:
+            pinned (bool): Whether the audio is downloaded for offline
+                sessions. The index of the cache is then saved by the caller.
+
+        Returns:
+            str: The path of the audio file.
+        """
+        path = audio_cache.path(self.url)
+        if path is None:
             r = requests.get(self.url)
-            # We have to use delete is false otherwise we have permission
-            # error on windows
-            f = tempfile.NamedTemporaryFile(suffix=self.ext, delete=False)
-            f.write(r.content)
-            f.seek(0)
-            f.close()
+            r.raise_for_status()
+            content = r.content
             # Remove metadata in windows
             # It prevents playsound to playfile
-            if system() == "Windows":
-                mp3 = MP3(f.name)
-                mp3.delete()
-                mp3.save()
-            audio_cache[self.url] = f
+            if sys.platform == "win32":
+                content = remove_metadata(content)
+            path = audio_cache.put(
+                self.url, content, self.ext, save=not pinned, pinned=pinned
+            )
+            if not pinned:
+                audio_buffers.put(self.url, content)
+        return path
 
     def play(self):
-        """Download and Play the audio."""
-        self.download()
-        f = audio_cache[self.url]
-        threading.Thread(target=playsound, args=(f.name,), daemon=True).start()
+        """Download and Play the audio. The audio is played from memory when
+        it was downloaded recently."""
+        path = self.download()
+        audio_player.play(path, audio_buffers.get(self.url))
 
 
 class Summary(APIObject):
@@ -656,8 +1333,8 @@ class AnswerManager:
 
         # Check for reading questions with two readings.
         if self.question_type == QuestionType.READING and len(answers) == 2:
-            roma1 = romkan.to_roma(answers[0].value)
-            roma2 = romkan.to_roma(answers[1].value)
+            roma1 = to_roma(answers[0].value)
+            roma2 = to_roma(answers[1].value)
 
             # Check if the two readings are the same in romaji.
             if roma1 == roma2:
@@ -828,9 +1505,14 @@ class Subject(APIObject):
     def __init__(self, data):
         super().__init__(data)
         self._readings = None
-        self._auxiliary_readings = None
-        self._auxiliary_meanings = None
+        self._audios = None
+        self._audios_by_gender = None
+        self._ascii = {}
+        self._auxiliary_subject = None
+        self._auxiliary_resolved = False
         self._meanings = None
+        # User synonyms from the study materials. Set by the cache.
+        self.meaning_synonyms = []
         self._meaning_question = Question(self, QuestionType.MEANING)
         self._reading_question = None
 
@@ -847,6 +1529,11 @@ class Subject(APIObject):
         """Get the object type."""
         return self.data["object"]
 
+    @property
+    def level(self) -> int:
+        """Get the level of the subject."""
+        return self.data["data"]["level"]
+
     @property
     def audios(self) -> List[Audio]:
         """Get the audios for vocabulary items (only mp3).
@@ -854,15 +1541,28 @@ class Subject(APIObject):
         Returns:
             List[Audio]: The audios.
         """
-        _audios = []
-        if self.object == SubjectObject.VOCABULARY:
-            _audios = list(
-                filter(
-                    lambda audio: audio.ext == ".mp3",
-                    [Audio(data) for data in self.data["data"]["pronunciation_audios"]],
-                )
-            )
-        return _audios
+        if self._audios is None:
+            self._audios = []
+            if self.object == SubjectObject.VOCABULARY:
+                self._audios = [
+                    audio
+                    for audio in map(Audio, self.data["data"]["pronunciation_audios"])
+                    if audio.ext == ".mp3"
+                ]
+        return self._audios
+
+    @property
+    def audios_by_gender(self) -> dict:
+        """Get the audios per gender of the voice actor.
+
+        Returns:
+            dict: The audios (List[Audio]) per gender.
+        """
+        if self._audios_by_gender is None:
+            self._audios_by_gender = {Gender.FEMALE: [], Gender.MALE: []}
+            for audio in self.audios:
+                self._audios_by_gender[audio.voice_gender].append(audio)
+        return self._audios_by_gender
 
     @property
     def characters(self):
@@ -873,26 +1573,59 @@ class Subject(APIObject):
         return _characters
 
     @property
-    def ascii(self):
-        """Get the ascii art of the radical from its image.
+    def image_url(self) -> str:
+        """Get the url of the svg image of a radical without characters.
 
         Returns:
-            str: The ascii art or None if we can't find the URL.
+            str: The url or None if the subject has characters.
         """
         url = None
-        _ascii = None
+        if not self.data["data"]["characters"]:
+            for image in self.data["data"].get("character_images", []):
+                content_type = image.get("content_type")
+                if content_type == "image/svg+xml":
+                    url = image.get("url")
+                    break
+        return url
 
-        # Get the image URL. We want the smallest png.
-        for image in self.data["data"]["character_images"]:
-            content_type = image.get("content_type")
-            if content_type == "image/svg+xml":
-                url = image.get("url")
-                break
+    @property
+    def ascii_ready(self) -> bool:
+        """Whether the characters can be displayed without rendering the
+        ascii art of the radical."""
+        return (
+            not self.image_url
+            or Cache.get_ascii_art(self.image_url, ascii_width()) is not None
+        )
 
-        if url:
-            _ascii = url_to_ascii(url)
+    @property
+    def ascii_placeholder(self) -> str:
+        """Get a box of the size of the ascii art displayed while the ascii
+        art is rendered.
+
+        Returns:
+            str: The placeholder.
+        """
+        width = ascii_width()
+        height = ascii_height(width)
+        lines = ["|" + " " * (width - 2) + "|" for _ in range(height - 2)]
+        lines[len(lines) // 2] = "|" + "Loading...".center(width - 2) + "|"
+        border = "+" + "-" * (width - 2) + "+"
+        return "\n".join([border] + lines + [border])
+
+    @property
+    def ascii(self):
+        """Get the ascii art of the radical from its image in the width that
+        fits the terminal.
 
-        return _ascii
+        Returns:
+            str: The ascii art or None if we can't find the URL.
+        """
+        if not self.image_url:
+            return None
+        width = ascii_width()
+        if width not in self._ascii:
+            self._ascii[width] = url_to_ascii(self.image_url, width)
+        return self._ascii[width]
 
     @property
     def readings(self):
@@ -916,44 +1649,82 @@ class Subject(APIObject):
         return self._readings
 
     @property
-    def auxiliary_readings(self):
-        # Only works for vocabulary. We want to set kanji answer as inexact
+    def auxiliary_subject_id(self) -> int:
+        """Get the id of the kanji used by a single kanji vocabulary.
+
+        Returns:
+            int: The kanji id or None when the subject has no auxiliary.
+        """
+        _id = None
         if (
             self.object == SubjectObject.VOCABULARY
-            and len(self.characters) == 1
-            and self._auxiliary_readings is None
+            and len(self.data["data"]["characters"] or "") == 1
+            and self.component_subject_ids
         ):
-            component_subject_ids = self.data["data"]["component_subject_ids"]
-            kanji = Cache.get_subject(component_subject_ids[0])
-            if kanji:
-                self._auxiliary_readings = kanji.readings
-        return self._auxiliary_readings
+            _id = self.component_subject_ids[0]
+        return _id
+
+    @property
+    def auxiliary_subject(self):
+        """Get the kanji whose answers are inexact for this vocabulary.
+
+        It is attached when the session is prepared. Otherwise it is looked up
+        in the cache and fetched when a client exists. A kanji that cannot be
+        found is looked up again on the next call.
+
+        Returns:
+            Subject: The kanji or None.
+        """
+        subject_id = self.auxiliary_subject_id
+        if not self._auxiliary_resolved and subject_id:
+            subject = Cache.subjects.get(subject_id)
+            if subject is None and Cache.client:
+                subject = Cache.get_subject(subject_id)
+            self.set_auxiliary_subject(subject)
+        return self._auxiliary_subject
+
+    def set_auxiliary_subject(self, subject):
+        """Attach the kanji whose answers are inexact for this vocabulary.
+
+        Args:
+            subject (Subject): The kanji or None when it is not found yet.
+        """
+        self._auxiliary_subject = subject
+        self._auxiliary_resolved = subject is not None
+
+    @property
+    def auxiliary_readings(self):
+        # Only works for vocabulary. We want to set kanji answer as inexact
+        return self.auxiliary_subject.readings if self.auxiliary_subject else None
 
     @property
     def meanings(self):
-        """Get the meaning of the kanji."""
+        """Get the meaning of the kanji. User synonyms are accepted answers."""
         if self._meanings is None:
             self._meanings = AnswerManager(
                 [
                     Answer(answer, QuestionType.MEANING)
                     for answer in self.data["data"]["meanings"]
                 ]
+                + [
+                    Answer(
+                        {
+                            "meaning": synonym,
+                            "primary": False,
+                            "accepted_answer": True,
+                            "type": "user_synonym",
+                        },
+                        QuestionType.MEANING,
+                    )
+                    for synonym in self.meaning_synonyms
+                ]
             )
         return self._meanings
 
     @property
     def auxiliary_meanings(self):
         # Only works for vocabulary. We want to set kanji answer as inexact
-        if (
-            self.object == SubjectObject.VOCABULARY
-            and len(self.characters) == 1
-            and self._auxiliary_meanings is None
-        ):
-            component_subject_ids = self.data["data"]["component_subject_ids"]
-            kanji = Cache.get_subject(component_subject_ids[0])
-            if kanji:
-                self._auxiliary_meanings = kanji.meanings
-        return self._auxiliary_meanings
+        return self.auxiliary_subject.meanings if self.auxiliary_subject else None
 
     @property
     def reading_question(self):
@@ -1110,6 +1881,82 @@ class Question:
         return _mnemonic
 
 
+def check_answers(
+    answers: Iterable[Tuple[int, QuestionType, str]], hard_mode: bool = False
+) -> List[AnswerType]:
+    """Check a batch of answers without starting a session.
+
+    The answers are checked against the subjects of the cache. Subjects that
+    are not in the cache, and the kanji of the single kanji vocabularies, are
+    fetched in batches when a client exists. Identical answers to the same
+    question are only checked once.
+
+    Usage:
+        >>> check_answers([(440, QuestionType.MEANING, "One")])
+        ['correct']
+
+    Args:
+        answers (Iterable[Tuple[int, QuestionType, str]]): The subject id,
+            the question type and the inputed answer of each answer.
+        hard_mode (bool): Whether to use hard mode.
+
+    Returns:
+        List[AnswerType]: The answer types in the same order as the answers.
+
+    Raises:
+        ValueError: If a subject is unknown or if a reading question is asked
+            for a radical.
+    """
+    answers = list(answers)
+
+    subject_ids = set(subject_id for subject_id, _, _ in answers)
+    missing_ids = subject_ids - set(Cache.subjects.keys())
+    if Cache.client:
+        # The kanji of the fetched vocabularies are only known once they are
+        # fetched: they are fetched with a second request.
+        for _ in range(2):
+            missing_ids |= (
+                set(
+                    Cache.subjects[subject_id].auxiliary_subject_id
+                    for subject_id in subject_ids
+                    if subject_id in Cache.subjects
+                )
+                - set(Cache.subjects.keys())
+                - {None}
+            )
+            if not missing_ids:
+                break
+            Cache.client._subject_per_ids(list(missing_ids))
+            missing_ids = set()
+
+    # Normalize each distinct inputed answer once.
+    normalized_answers = {
+        inputed_answer: inputed_answer.lower().strip()
+        for inputed_answer in set(answer for _, _, answer in answers)
+    }
+
+    answer_types = {}
+    results = []
+    for subject_id, question_type, inputed_answer in answers:
+        key = (subject_id, question_type, normalized_answers[inputed_answer])
+        if key not in answer_types:
+            # The missing subjects were fetched above.
+            subject = Cache.subjects.get(subject_id)
+            if subject is None:
+                raise ValueError(f"Unknown subject {subject_id}")
+            question = (
+                subject.reading_question
+                if question_type == QuestionType.READING
+                else subject.meaning_question
+            )
+            if question is None:
+                raise ValueError(f"Subject {subject_id} has no {question_type}.")
+            answer_types[key] = question.solve(key[2], hard_mode)
+        results.append(answer_types[key])
+
+    return results
+
+
 class Session:
     """The session. Base class for Reviews and Lessons."""
 
@@ -1123,79 +1970,263 @@ class Session:
         self.client = client
         self.subjects = subjects
         self.last_audio_played = None
+        self.displayed_subject = None
 
-    def select_audio(self, audios: List[Audio]) -> Audio:
-        """Select the audio to play.
+    def select_audio(self, subject: Subject) -> Audio:
+        """Select the audio to play. An audio already downloaded is preferred.
 
         Args:
-            audios (List[Audio]): The audios.
+            subject (Subject): The subject.
 
         Returns:
             Audio: The audio to play.
         """
-        audio = None
-
-        audio_cache_urls = list(
-            set(audio_cache.keys()).intersection(set([a.url for a in audios]))
-        )
-        # use cache
-        if audio_cache_urls:
-            audio = list(filter(lambda a: a.url in audio_cache_urls[0], audios))[0]
-        #  In alternate mode select a random voice actor to begin with
+        voice_mode = self.client.options.voice_mode
+        gender = None
+        #  In alternate mode select a voice actor to begin with
         #  We then alternate with female and male voice actors
-        elif self.client.options.voice_mode == VoiceMode.FEMALE or (
-            self.client.options.voice_mode == VoiceMode.ALTERNATE
+        if voice_mode == VoiceMode.FEMALE or (
+            voice_mode == VoiceMode.ALTERNATE
             and self.last_audio_played
             and self.last_audio_played.voice_gender == Gender.MALE
         ):
-            audio = list(filter(lambda a: a.voice_gender == Gender.FEMALE, audios))[0]
-        elif self.client.options.voice_mode == VoiceMode.MALE or (
-            self.client.options.voice_mode == VoiceMode.ALTERNATE
+            gender = Gender.FEMALE
+        elif voice_mode == VoiceMode.MALE or (
+            voice_mode == VoiceMode.ALTERNATE
             and self.last_audio_played
             and self.last_audio_played.voice_gender == Gender.FEMALE
         ):
-            audio = list(filter(lambda a: a.voice_gender == Gender.MALE, audios))[0]
+            gender = Gender.MALE
+
+        audios = (gender and subject.audios_by_gender[gender]) or subject.audios
+        # There are only a few voice actors per gender.
+        cached_audios = [
+            a for a in audios if a.url in audio_buffers or a.url in audio_cache
+        ]
+        return random.choice(cached_audios or audios)
+
+    def prefetch_audios(self, subjects: Iterable[Subject]):
+        """Download in the background the audios that may be played for the
+        subjects. The other background downloads are cancelled.
+
+        Args:
+            subjects (Iterable[Subject]): The upcoming subjects.
+        """
+        downloads = {}
+        for subject in subjects:
+            for audio in self.client._session_audios(subject):
+                if audio.url not in audio_cache:
+                    downloads[audio.url] = audio._download
+        audio_prefetcher.prefetch(downloads)
+
+    def render_radicals(self, subjects: Iterable[Subject]):
+        """Render in the background the ascii art of the upcoming radicals.
+
+        Args:
+            subjects (Iterable[Subject]): The upcoming subjects.
+        """
+        for subject in subjects:
+            if not subject.ascii_ready:
+                render_ascii_async(subject.image_url)
+
+    def draw_subject(
+        self, header: str, subject: Subject, footer: str = "", update: bool = False
+    ):
+        """Draw a screen with the characters of a subject between a header and
+        a footer. A radical not rendered yet is replaced by a placeholder and
+        drawn in its place once rendered.
+
+        Args:
+            header (str): The text above the characters.
+            subject (Subject): The subject.
+            footer (str): The text below the characters.
+            update (bool): Whether to only redraw the lines that changed since
+                the last screen.
+        """
+        self.displayed_subject = subject
+        ascii_ready = subject.ascii_ready
+        characters = subject.characters if ascii_ready else subject.ascii_placeholder
+        frame = header + characters + "\n\n" + footer
+        if update:
+            screen.update(frame)
         else:
-            random_index = random.randrange(len(audios))
-            audio = audios[random_index]
+            screen.draw(frame)
+        if ascii_ready:
+            return
+
+        row = header.count("\n") + 1
 
-        return audio
+        def redraw(future: Future):
+            if self.displayed_subject is subject and not future.exception():
+                screen.draw_at(subject.characters, row)
 
+        render_ascii_async(subject.image_url).add_done_callback(redraw)
 
-class QuestionQueue(list):
-    """Handle queue."""
 
-    def __init__(self) -> None:
-        """Initialize the queue."""
-        super().__init__()
+class QuestionQueue:
+    """Handle queue.
 
-    def shuffle(self):
-        """Shuffle the queue.
+    The questions are kept in a deque. An index of the questions per subject
+    tracks the subjects in the queue. The number of subjects in the queue is
+    limited by the window size.
+    """
+
+    def __init__(
+        self,
+        order: ReviewOrder = ReviewOrder.RANDOM,
+        window_size: int = WINDOW_SIZE,
+        adaptive: bool = False,
+    ) -> None:
+        """Initialize the queue.
 
-        TODO implement logic to implement reordering scripts.
-        The reordering script should be activated and configured
-        in the client options.
+        Args:
+            order (ReviewOrder): The review order. In back-to-back order, the
+                reading of a subject is asked right after its meaning.
+            window_size (int): The number of subjects in the queue at once.
+            adaptive (bool): Whether the window size follows the accuracy
+                of the answers.
         """
-        random.shuffle(self)
+        self.order = order
+        self.window_size = window_size
+        self.adaptive = adaptive
+        self.wrapping_up = False
+        self._questions = deque()
+        self._subject_questions = {}
+        self._answers = deque(maxlen=WINDOW_ACCURACY_ANSWERS)
+        self._error_streak = 0
+
+    def __len__(self) -> int:
+        return len(self._questions)
 
-    def rebuild(self, subjects: List[Subject]):
+    def __iter__(self) -> Iterator[Question]:
+        return iter(self._questions)
+
+    @property
+    def nb_session_subjects(self) -> int:
+        """Get the number of subjects in the queue."""
+        return len(self._subject_questions)
+
+    def append(self, question: Question):
+        """Add a question at the end of the queue.
+
+        Args:
+            question (Question): The question.
+        """
+        self._questions.append(question)
+        self._subject_questions.setdefault(question.subject, []).append(question)
+
+    def pop(self) -> Question:
+        """Remove the next question from the queue.
+
+        Returns:
+            Question: The question.
+        """
+        question = self._questions.popleft()
+        questions = self._subject_questions[question.subject]
+        questions.remove(question)
+        if not questions:
+            del self._subject_questions[question.subject]
+        return question
+
+    def requeue(self, question: Question):
+        """Put back a question at a random position of the queue. It is never
+        put first so it is not asked twice in a row.
+
+        Args:
+            question (Question): The question.
+        """
+        position = 0
+        if self._questions:
+            position = random.randrange(1, len(self._questions) + 1)
+        self._questions.insert(position, question)
+        self._subject_questions.setdefault(question.subject, []).append(question)
+
+    def record_answer(self, correct: bool):
+        """Adapt the window size to an answer. The window grows by one
+        subject when the accuracy of the last answers is high and shrinks by
+        one subject after a streak of wrong answers.
+
+        Args:
+            correct (bool): Whether the answer was correct.
+        """
+        if not self.adaptive:
+            return
+
+        self._answers.append(correct)
+        if correct:
+            self._error_streak = 0
+            accuracy = sum(self._answers) / len(self._answers)
+            full = len(self._answers) == self._answers.maxlen
+            if full and accuracy >= WINDOW_GROWTH_ACCURACY:
+                self.window_size = min(self.window_size + 1, MAX_WINDOW_SIZE)
+                self._answers.clear()
+        else:
+            self._error_streak += 1
+            if self._error_streak >= WINDOW_SHRINK_ERRORS:
+                self.window_size = max(self.window_size - 1, MIN_WINDOW_SIZE)
+                self._error_streak = 0
+                self._answers.clear()
+
+    def wrap_up(self):
+        """Stop adding subjects to the queue. The subjects already in the
+        queue are still asked."""
+        self.wrapping_up = True
+
+    def rebuild(self, subjects: Deque[Subject], max_new_subjects: int = None):
         """Build the queue. Add correct number of questions to the queue.
-        At the initialisation, we add MAX_QUEUE_SIZE or USER LIMIT
-        questions to the queue.
+        Subjects are added until the queue holds window_size subjects, unless
+        the queue is wrapping up. Only the questions of the new subjects are
+        shuffled. The subjects are sorted by the client beforehand.
 
         Args:
-            subjects (List[Subject]): The subjects.
+            subjects (Deque[Subject]): The subjects not in the queue yet.
+                The subjects added to the queue are removed from it.
+            max_new_subjects (int): The maximum number of subjects to add.
+        """
+        if self.wrapping_up:
+            return
+
+        window_size = self.window_size
+        if max_new_subjects is not None:
+            window_size = min(window_size, self.nb_session_subjects + max_new_subjects)
+
+        new_subjects = []
+        nb_new_subjects = 0
+        while self.nb_session_subjects + nb_new_subjects < window_size and subjects:
+            subject = subjects.popleft()
+            new_subjects.append(subject)
+            # A subject may be in the queue already.
+            if subject not in self._subject_questions:
+                nb_new_subjects += 1
+
+        if self.order == ReviewOrder.BACK_TO_BACK:
+            # Keep the questions of a subject together.
+            random.shuffle(new_subjects)
+        new_questions = [q for subject in new_subjects for q in subject.questions]
+        if self.order != ReviewOrder.BACK_TO_BACK:
+            random.shuffle(new_questions)
+        for question in new_questions:
+            self.append(question)
+
+    def subjects(self) -> List[Subject]:
+        """Get the subjects in the queue.
+
+        Returns:
+            List[Subject]: The subjects.
         """
-        queue_subjects = set([question.subject for question in self])
-        i = len(queue_subjects)
+        return list(self._subject_questions)
 
-        while i < MAX_QUEUE_SIZE and len(subjects) > 0:
-            subject = subjects.pop(0)
-            self.extend(subject.questions)
-            i += 1
+    def reading_subjects(self) -> List[Subject]:
+        """Get the subjects with a reading question in the queue.
 
-        self.nb_session_subjects = i
-        self.shuffle()
+        Returns:
+            List[Subject]: The subjects whose audio may be played.
+        """
+        return [
+            subject
+            for subject, questions in self._subject_questions.items()
+            if any(q.question_type == QuestionType.READING for q in questions)
+        ]
 
 
 class ReviewSession(Session):
@@ -1211,7 +2242,7 @@ class ReviewSession(Session):
             subjects (List[Subject]): The subjects.
         """
         super().__init__(client, subjects)
-        self.subjects = self.subjects[: client.options.limit]
+        self.subjects = deque(self.subjects[: client.options.limit])
         self.from_lesson = from_lesson
         self.nb_subjects = len(self.subjects)
         self.nb_session_subjects = 0
@@ -1219,7 +2250,14 @@ class ReviewSession(Session):
         self.nb_incorrect_answers = 0  # Multiple error count multiple times.
         self.nb_completed_subjects = 0
         self.nb_session_completed_subjects = 0
-        self.queue = QuestionQueue()
+        # Lesson reviews are not time-boxed.
+        self.minutes = None if from_lesson else client.options.minutes
+        self.started_at = None
+        self.queue = QuestionQueue(
+            client.options.order,
+            client.options.window_size,
+            client.options.adaptive_window,
+        )
 
     def start(self):
         """Start the reviews.
@@ -1233,23 +2271,27 @@ class ReviewSession(Session):
 
         clear_terminal()
 
-        print(
+        echo(
             "\nReview session started.\n"
             "The session will end when you have answered all the questions.\n"
             "Questions are submitted automatically when both reading and "
             "meaning have been answer for a same subject.\n"
+            "You can wrap up the session by typing 'w' after an answer: "
+            "no new subject is added and the session ends once the current "
+            "subjects are answered.\n"
             "You can quit the session at any time by typing 'ctrl + c'.\n\n"
             f"This session contains {self.nb_subjects} subjects.\n"
         )
 
-        input("Press enter to start the session...")
+        ask("Press enter to start the session...")
         """Start the review session."""
 
-        self.queue.rebuild(self.subjects)
+        self.started_at = time.monotonic()
+        self.rebuild_queue()
 
         while self.queue:
-            question = self.queue.pop(0)
-            clear_terminal()
+            question = self.queue.pop()
+            audio_player.stop()
 
             total_answers = self.nb_incorrect_answers + self.nb_correct_answers
             correct_rate = "X"
@@ -1257,11 +2299,18 @@ class ReviewSession(Session):
                 correct_rate = (
                     str(round(self.nb_correct_answers * 100 / total_answers, 2)) + "%"
                 )
-            print(
-                f"Total Reviews {self.nb_completed_subjects}/{self.nb_subjects}",
-                f"- {correct_rate}:\n",
+            header = (
+                f"Total Reviews {self.nb_completed_subjects}/{self.nb_subjects} "
+                f"- {correct_rate}:\n\n"
             )
-            print(question.subject.characters + "\n")
+            if self.minutes:
+                remaining_seconds = max(self.minutes * 60 - self.elapsed_seconds, 0)
+                minutes, seconds = divmod(int(remaining_seconds), 60)
+                header += f"Time left: {minutes}:{seconds:02d}\n\n"
+            if self.queue.wrapping_up:
+                nb_left = len(set(self.queue.subjects()) | {question.subject})
+                header += f"Wrapping up: {nb_left} subjects left.\n\n"
+            self.draw_subject(header, question.subject)
             answer_type = None
 
             """We use a loop in case the user answers is not wrong but not acceptable
@@ -1273,12 +2322,20 @@ class ReviewSession(Session):
                 answer_type = self.ask_answer(question)
                 self.process_answer(question, answer_type)
 
+            self.queue.record_answer(question.solved)
             self.process_subject(question.subject)
 
             self.ask_audio(question)
-            input("\nPress enter to continue...")
-
-        print("\n\nReviews are done!")
+            self.ask_continue()
+
+        echo("\n\nReviews are done!")
+        stats = audio_player.stats
+        if stats["plays"]:
+            echo(
+                f"Audio: {stats['plays']} plays, started in "
+                f"{stats['average_latency'] * 1000:.0f} ms on average "
+                f"({stats['max_latency'] * 1000:.0f} ms at most)."
+            )
 
     def process_answer(self, question: Question, answer_type: AnswerType):
         """Process the answer.
@@ -1289,41 +2346,38 @@ class ReviewSession(Session):
         """
         # If the user answers correctly, we remove the card from the deck
         if answer_type == AnswerType.CORRECT:
-            print("\nCorrect!")
+            echo("\nCorrect!")
             self.nb_correct_answers += 1
             question.solved = True
 
         # If the user is a bit off, we show the correct answer and ask
         # to validate his answer
         elif answer_type == AnswerType.A_BIT_OFF:
-            print(
+            echo(
                 "Your answer is a bit off.",
                 f"The correct answer is: {question.answer_values}",
             )
-            if input("Do you want to validate your answer? (Y/n) ") in [
+            if ask("Do you want to validate your answer? (Y/n) ") in [
                 "n",
                 "N",
             ]:
                 self.nb_incorrect_answers += 1
                 question.add_wrong_answer()
-                self.queue.shuffle()
-
-                # Add the question at the end of the queue
                 # So we don't have it twice in a row.
-                self.queue.append(question)
+                self.queue.requeue(question)
             else:
                 self.nb_correct_answers += 1
                 question.solved = True
 
         # If the user answers another reading, we ask the user to correct it
         elif answer_type == AnswerType.INEXACT:
-            print(
+            echo(
                 "\nTry again. We are looking for the",
                 f"{question.primary.type}.\n",
             )
         # If the user answers incorrectly, we show the correct answer
         else:
-            print(
+            echo(
                 "\nWrong ! The correct answer is:",
                 question.answer_values,
             )
@@ -1333,21 +2387,19 @@ class ReviewSession(Session):
                 and self.client.options.double_check
             ):
                 time.sleep(0.5)
-                answer_was_correct = input("My answer was correct [y/N] ")
+                answer_was_correct = ask("My answer was correct [y/N] ")
             else:
                 answer_was_correct = "N"
 
             if answer_was_correct not in ["y", "Y"]:
                 self.nb_incorrect_answers += 1
                 question.add_wrong_answer()
-                self.queue.shuffle()
-                # Add the question at the end of the queue
                 # So we don't have it twice in a row.
-                self.queue.append(question)
+                self.queue.requeue(question)
                 if self.client.options.display_mnemonics:
-                    print(f"\nMnemonic: {wanikani_tag_to_color(question.mnemonic)}")
+                    echo(f"\nMnemonic: {wanikani_tag_to_color(question.mnemonic)}")
             else:
-                print("Question was changed to correct")
+                echo("Question was changed to correct")
                 self.nb_correct_answers += 1
                 question.solved = True
 
@@ -1377,7 +2429,43 @@ class ReviewSession(Session):
                 # When removing an item from the queue it's important
                 # to rebuild the queue.
                 # It's not needed for lessons.
-                self.queue.rebuild(self.subjects)
+                self.rebuild_queue()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Get the number of seconds since the start of the session."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def seconds_per_subject(self) -> float:
+        """Get the average review time of the subjects done in the session."""
+        if not self.nb_session_completed_subjects:
+            return DEFAULT_SECONDS_PER_SUBJECT
+        return self.elapsed_seconds / self.nb_session_completed_subjects
+
+    def nb_admissible_subjects(self) -> int:
+        """Get the number of subjects that can be added to the queue while
+        the projected end of the session fits in the time budget.
+
+        Returns:
+            int: The number of subjects.
+        """
+        remaining_seconds = self.minutes * 60 - self.elapsed_seconds
+        nb_subjects = int(remaining_seconds // self.seconds_per_subject)
+        return max(nb_subjects - self.queue.nb_session_subjects, 0)
+
+    def rebuild_queue(self):
+        """Add subjects to the queue. A time-boxed session wraps up as soon
+        as a new subject would not be done in time."""
+        max_new_subjects = None
+        if self.minutes and self.subjects and not self.queue.wrapping_up:
+            max_new_subjects = self.nb_admissible_subjects()
+            if not max_new_subjects:
+                self.queue.wrap_up()
+
+        self.queue.rebuild(self.subjects, max_new_subjects)
+        self.prefetch_audios(self.queue.reading_subjects())
+        self.render_radicals(self.queue.subjects())
 
     def ask_answer(self, question: Question):
         """Ask the user for an answer.
@@ -1409,9 +2497,9 @@ class ReviewSession(Session):
         if question.question_type == QuestionType.MEANING:
             inputed_answer = None
             while not inputed_answer:
-                inputed_answer = input(prompt)
+                inputed_answer = ask(prompt)
                 if not inputed_answer:
-                    print("\a")
+                    echo("\a")
         else:
             try:
                 inputed_answer = input_kana(prompt)
@@ -1421,6 +2509,13 @@ class ReviewSession(Session):
         answer_type = question.solve(inputed_answer, self.client.options.hard_mode)
         return answer_type
 
+    def ask_continue(self):
+        """Wait for the user to continue. Typing 'w' wraps up the session."""
+        if self.from_lesson or self.queue.wrapping_up:
+            ask("\nPress enter to continue...")
+        elif ask("\nPress enter to continue ('w' to wrap up)...") in ["w", "W"]:
+            self.queue.wrap_up()
+
     def ask_audio(self, question: Question):
         """Ask the user if they want to hear the audio.
 
@@ -1433,15 +2528,26 @@ class ReviewSession(Session):
             and question.question_type == QuestionType.READING
             and (
                 self.client.options.autoplay
-                or input("\nWould you like to hear the audio? [y/N] ") in ["y", "Y"]
+                or ask("\nWould you like to hear the audio? [y/N] ") in ["y", "Y"]
             )
         ):
-            audio = self.select_audio(question.subject.audios)
+            audio = self.select_audio(question.subject)
             audio.play()
             self.last_audio_played = audio
 
 
 class LessonSession(Session):
+    def __init__(self, client: Client, subjects: List[Subject]):
+        """Initialize the lesson session.
+
+        Args:
+            client (Client): The client.
+            subjects (List[Subject]): The subjects.
+        """
+        super().__init__(client, subjects)
+        # The tab screens of each subject per tab index, rendered once.
+        self.tab_frames = {}
+
     def start(self):
         """Start the Lesson session.
 
@@ -1450,7 +2556,7 @@ class LessonSession(Session):
         We repeat this process until the user is done.
         """
         clear_terminal()
-        print(
+        echo(
             "Lesson session started.\n"
             "You will first be shown a batch of new subjects.\n"
             "You will then be asked to review the subjects.\n"
@@ -1460,23 +2566,35 @@ class LessonSession(Session):
             "You can quit the session at any time by typing 'ctrl + c'.\n\n"
         )
 
-        input("Press enter to start the session...")
+        ask("Press enter to start the session...")
 
         nb_lessons = len(self.subjects)
         nb_completed_lessons = 0
-        batches = chunks(self.subjects, 3)
+        batches = chunks(self.subjects, LESSON_BATCH_SIZE)
 
         for batch in batches:
+            self.prefetch_audios(
+                s for s in batch if s.object == SubjectObject.VOCABULARY
+            )
+            self.render_radicals(
+                batch
+                + [
+                    Cache.subjects[i]
+                    for s in batch
+                    for i in s.component_subject_ids
+                    if i in Cache.subjects
+                ]
+            )
             for subject in batch:
-                clear_terminal()
+                audio_player.stop()
                 self.lesson_interface(subject)
 
             ReviewSession(self.client, batch, from_lesson=True).start()
             nb_completed_lessons += len(batch)
-            print(f"\nLessons: {nb_completed_lessons}/{nb_lessons}")
+            echo(f"\nLessons: {nb_completed_lessons}/{nb_lessons}")
 
             if nb_completed_lessons < nb_lessons:
-                input("\nPress enter to continue...")
+                ask("\nPress enter to continue...")
 
     def lesson_interface(self, subject: Subject):
         """Show the subjects to the user with a nice CLI interface.
@@ -1485,49 +2603,74 @@ class LessonSession(Session):
             subject (Subject): The subject.
         """
         tab_index = 0
-        while True:
-            clear_terminal()
-            print(
-                f"{subject.object.capitalize().replace('_', ' ')}:"
-                f"\n\n{subject.characters}\n"
+        header = f"{subject.object.capitalize().replace('_', ' ')}:\n\n"
+        tabs = ["composition", "meaning", "reading", "context"]
+        if subject.object == SubjectObject.RADICAL:
+            tabs = ["meaning"]
+        elif subject.object == SubjectObject.KANJI:
+            tabs = ["composition", "meaning", "reading"]
+        elif subject.object == SubjectObject.KANA_VOCABULARY:
+            tabs = ["meaning"]
+
+        with RawInput(use_raw_input=False) as terminal:
+            first_frame = True
+            audio_played = False
+            while True:
+                footer = self.tab_frame(subject, tabs, tab_index)
+                # The header and the characters stay the same between tabs.
+                self.draw_subject(header, subject, footer, update=not first_frame)
+                first_frame = False
+                if tabs[tab_index] == "reading" and not audio_played:
+                    self.play_reading_audio(subject)
+                    audio_played = True
+                key = None
+
+                # Only accept valid keys
+                while key not in ["\n", "\r", Key.RIGHT, Key.LEFT]:
+                    key = terminal.read_key()
+                if key == Key.LEFT:
+                    tab_index -= 1
+                else:  # Right or Enter
+                    tab_index += 1
+
+                if tab_index < 0:
+                    tab_index = 0
+                elif tab_index > len(tabs) - 1:
+                    # Go to next subject
+                    break
+
+    def tab_frame(self, subject: Subject, tabs: List[str], tab_index: int) -> str:
+        """Get the screen of a tab below the subject characters. The screen
+        of a tab is rendered once per subject.
+
+        Args:
+            subject (Subject): The subject.
+            tabs (List[str]): The tabs of the subject.
+            tab_index (int): The tab index.
+
+        Returns:
+            str: The tab screen.
+        """
+        frames = self.tab_frames.setdefault(subject.id, {})
+        if tab_index not in frames:
+            frames[tab_index] = (
+                self.beautify_tabs_display(tabs, tab_index)
+                + "\n\n\n"
+                + getattr(self, f"tab_{tabs[tab_index]}")(subject)
+                + "\n\nPress directional keys to navigate the tabs.\n"
             )
-            tabs = ["composition", "meaning", "reading", "context"]
-            if (
-                subject.object == SubjectObject.VOCABULARY
-                and not self.client.options.silent
-            ):
-                # Pre download audio
-                self.select_audio(subject.audios).download()
-            if subject.object == SubjectObject.RADICAL:
-                tabs = ["meaning"]
-            elif subject.object == SubjectObject.KANJI:
-                tabs = ["composition", "meaning", "reading"]
-            elif subject.object == SubjectObject.KANA_VOCABULARY:
-                tabs = ["meaning"]
-
-            print(self.beautify_tabs_display(tabs, tab_index))
-            print("\n")
-            print(getattr(self, f"tab_{tabs[tab_index]}")(subject))
-
-            print("\nPress directional keys to navigate the tabs.")
-            key = None
-
-            # Only accept valid keys
-            while key not in [10, 67, 68]:
-                chr = getch(use_raw_input=False)
-                key = ord(chr)
-            if key == 67 or key == 10:  # Right
-                # sys.stdout.write("\n")
-                tab_index += 1
-            elif key == 68:  # Left
-                # sys.stdout.write("\n")
-                tab_index -= 1
-
-            if tab_index < 0:
-                tab_index = 0
-            elif tab_index > len(tabs) - 1:
-                # Go to next subject
-                break
+        return frames[tab_index]
+
+    def play_reading_audio(self, subject: Subject):
+        """Play the audio of the reading tab.
+
+        Args:
+            subject (Subject): The subject.
+        """
+        if subject.audios and not self.client.options.silent:
+            audio = self.select_audio(subject)
+            audio.play()
+            self.last_audio_played = audio
 
     def tab_composition(self, subject: Subject) -> str:
         """Show the composition tab.
@@ -1546,7 +2689,10 @@ class LessonSession(Session):
                 + f"{len(subjects)} {subjects[0].object}"
                 + ":\n"
                 + "\n".join(
-                    f"- {s.characters}: {s.meanings.primary.value}" for s in subjects
+                    # The radicals are rendered in the background.
+                    f"- {s.characters if s.ascii_ready else s.ascii_placeholder}: "
+                    f"{s.meanings.primary.value}"
+                    for s in subjects
                 )
             )
 
@@ -1576,11 +2722,6 @@ class LessonSession(Session):
         Returns:
             str: The tab content.
         """
-        if subject.audios and not self.client.options.silent:
-            audio = self.select_audio(subject.audios)
-            audio.play()
-            self.last_audio_played = audio
-
         return (
             subject.readings.answer_values
             + "\n\n"
@@ -1710,9 +2851,12 @@ def main():
 
     parser.add_argument("--dry-run", action="store_true", default=False, help=text)
 
-    text = "Number of subjects to review per session. (default: 50, max: 500)"
+    text = (
+        "Number of subjects to review per session. "
+        "(default: 50, or 500 with --minutes, max: 500)"
+    )
 
-    parser.add_argument("--limit", type=range_int_type, default=50, help=text)
+    parser.add_argument("--limit", type=range_int_type, help=text)
 
     text = "Display mnemonic when an answer is wrong. (default: False)"
 
@@ -1731,6 +2875,72 @@ def main():
     text = "Test a specific lessons or reviews using the subject ids. E.g (41,50,200)"
     parser.add_argument("--test-ids", help=text, default="")
 
+    text = (
+        "Download the vocabulary audios for offline sessions "
+        "with the download mode. Use --voice to only download "
+        "female or male voices. (default: False)"
+    )
+    parser.add_argument("--audio", action="store_true", default=False, help=text)
+
+    text = (
+        "Render the radicals without characters with the download mode "
+        "so they are displayed instantly. (default: False)"
+    )
+    parser.add_argument("--radicals", action="store_true", default=False, help=text)
+
+    text = (
+        "Order of the reviews.\n"
+        f"{ReviewOrder.RANDOM}: random order.\n"
+        f"{ReviewOrder.SRS}: lowest SRS stage first.\n"
+        f"{ReviewOrder.LEVEL}: lowest level first.\n"
+        f"{ReviewOrder.BACK_TO_BACK}: the reading right after the meaning.\n"
+        f"{ReviewOrder.OLDEST}: available for the longest time first.\n"
+        f"{ReviewOrder.TYPE}: radicals, then kanji, then vocabulary.\n"
+        f"(default: {ReviewOrder.RANDOM})"
+    )
+    parser.add_argument(
+        "--order",
+        choices=[
+            ReviewOrder.RANDOM,
+            ReviewOrder.SRS,
+            ReviewOrder.LEVEL,
+            ReviewOrder.BACK_TO_BACK,
+            ReviewOrder.OLDEST,
+            ReviewOrder.TYPE,
+        ],
+        default=ReviewOrder.RANDOM,
+        help=text,
+    )
+
+    text = (
+        "Number of subjects reviewed at once. The wrong answers are asked "
+        f"again among them. (default: {WINDOW_SIZE}, min: {MIN_WINDOW_SIZE}, "
+        f"max: {MAX_WINDOW_SIZE})"
+    )
+    parser.add_argument(
+        "--window", type=window_size_type, default=WINDOW_SIZE, help=text
+    )
+
+    text = (
+        "Review more subjects at once when most answers are correct and fewer "
+        "after several wrong answers in a row. Starts from --window. "
+        "(default: False)"
+    )
+    parser.add_argument(
+        "--adaptive-window", action="store_true", default=False, help=text
+    )
+
+    text = (
+        "Duration of the review session in minutes. New subjects are added "
+        "while the session can end in time based on your review speed, then "
+        "the remaining questions are asked. "
+        f"(default: no time limit, max: {MAX_MINUTES})"
+    )
+    parser.add_argument("--minutes", type=minutes_type, help=text)
+
+    text = "Levels of the audios to download. E.g: 1-10 or 5. (default: all levels)"
+    parser.add_argument("--levels", type=level_range_type, help=text)
+
     args = parser.parse_args()
 
     # Make sure that we've got an API key and that a mode has been set.
@@ -1743,10 +2953,17 @@ def main():
         voice_mode=args.voice,
         hard_mode=args.hard,
         dry_run=True if args.test_ids else args.dry_run,
-        limit=args.limit,
+        limit=args.limit or (MAX_NB_SUJECTS if args.minutes else 50),
         display_mnemonics=args.mnemonics,
         double_check=args.double_check,
         test_ids=list(map(int, args.test_ids.split(","))) if args.test_ids else [],
+        download_audio=args.audio,
+        levels=args.levels,
+        download_radicals=args.radicals,
+        order=args.order,
+        window_size=args.window,
+        adaptive_window=args.adaptive_window,
+        minutes=args.minutes,
     )
 
     client = Client(args.api_key, options=client_options)
@@ -1761,7 +2978,7 @@ def main():
     except Exception as e:
         print(e)
 
-    clear_audio_cache()
+    close_audio()
 
 
 def range_int_type(arg: str) -> int:
@@ -1790,5 +3007,72 @@ def range_int_type(arg: str) -> int:
     return arg
 
 
+def level_range_type(arg: str) -> Tuple[int, int]:
+    """Type function for argparse - a range of WaniKani levels
+
+    Args:
+        arg (str): The value of the argument. E.g: 1-10 or 5.
+
+    Returns:
+        Tuple[int, int]: The first and last levels.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid range.
+    """
+    try:
+        first, separator, last = arg.partition("-")
+        first = int(first)
+        last = int(last) if separator else first
+    except ValueError:
+        raise ArgumentTypeError("Must be a level or a range of levels. E.g: 1-10")
+    if not 1 <= first <= last <= MAX_LEVEL:
+        raise ArgumentTypeError(f"Levels must be between 1 and {MAX_LEVEL}")
+    return first, last
+
+
+def window_size_type(arg: str) -> int:
+    """Type function for argparse - a number of subjects in the review queue
+
+    Args:
+        arg (str): The value of the argument.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not within the bounds.
+    """
+    try:
+        arg = int(arg)
+    except ValueError:
+        raise ArgumentTypeError("Must be an integer")
+    if not MIN_WINDOW_SIZE <= arg <= MAX_WINDOW_SIZE:
+        raise ArgumentTypeError(
+            f"Window size must be between {MIN_WINDOW_SIZE} and {MAX_WINDOW_SIZE}"
+        )
+    return arg
+
+
+def minutes_type(arg: str) -> int:
+    """Type function for argparse - a duration in minutes
+
+    Args:
+        arg (str): The value of the argument.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not within the bounds.
+    """
+    try:
+        arg = int(arg)
+    except ValueError:
+        raise ArgumentTypeError("Must be an integer")
+    if not 1 <= arg <= MAX_MINUTES:
+        raise ArgumentTypeError(f"Minutes must be between 1 and {MAX_MINUTES}")
+    return arg
+
+
 if __name__ == "__main__":
     main()
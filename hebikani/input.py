@@ -6,12 +6,86 @@ Usage:
     >>> input_kana('arigatou')
     'ありがとう'
 """
+import os
 import re
+import signal
 import sys
+import threading
+from functools import lru_cache
+from itertools import groupby
 
-import romkan
+from hebikani.screen import write
+from hebikani.typing import Key
 
-__all__ = ["input_kana", "KanaWordBuilder"]
+__all__ = [
+    "input_kana",
+    "KanaWordBuilder",
+    "RawInput",
+    "to_hiragana",
+    "to_katakana",
+    "to_roma",
+]
+
+# Number of conversions kept in memory by each conversion function.
+# It is big enough to hold all the readings of WaniKani (~15k).
+KANA_CACHE_SIZE = 32768
+
+
+@lru_cache(maxsize=KANA_CACHE_SIZE)
+def to_hiragana(romaji: str) -> str:
+    """Convert romaji to hiragana. The conversions are cached.
+
+    Args:
+        romaji (str): The romaji to convert.
+
+    Returns:
+        str: The hiragana.
+
+    Examples:
+        >>> to_hiragana('arigatou')
+        'ありがとう'
+    """
+    import romkan
+
+    return romkan.to_hiragana(romaji)
+
+
+@lru_cache(maxsize=KANA_CACHE_SIZE)
+def to_katakana(romaji: str) -> str:
+    """Convert romaji to katakana. The conversions are cached.
+
+    Args:
+        romaji (str): The romaji to convert.
+
+    Returns:
+        str: The katakana.
+
+    Examples:
+        >>> to_katakana('bi-dama')
+        'ビーダマ'
+    """
+    import romkan
+
+    return romkan.to_katakana(romaji)
+
+
+@lru_cache(maxsize=KANA_CACHE_SIZE)
+def to_roma(kana: str) -> str:
+    """Convert hiragana or katakana to romaji. The conversions are cached.
+
+    Args:
+        kana (str): The kana to convert.
+
+    Returns:
+        str: The romaji.
+
+    Examples:
+        >>> to_roma('ベッドのした')
+        'beddonoshita'
+    """
+    import romkan
+
+    return romkan.to_roma(kana)
 
 
 def split_at_uppercase(s):
@@ -27,19 +101,55 @@ def split_at_uppercase(s):
         >>> split_at_uppercase('ITAdaKImasu')
         ['ITA', 'da', 'KI', 'masu']
     """
-    for i in range(len(s) - 1)[::-1]:
-        if s[i].isupper() and not s[i + 1].isupper():
-            s = s[: i + 1] + " " + s[i + 1 :]
-        if s[i].isupper() and not s[i - 1].isupper():
-            s = s[:i] + " " + s[i:]
-    return s.split()
+    return ["".join(group) for _, group in groupby(s, key=str.isupper)]
+
+
+@lru_cache(maxsize=None)
+def syllable_chars() -> frozenset:
+    """Get the characters found before the last letter of a romaji syllable.
+    Any other character ends the current syllable: its kana cannot change
+    anymore. "'" is added since "n'" depends on the next letter.
+
+    Returns:
+        frozenset: The characters.
+    """
+    import romkan
+
+    return frozenset(
+        char
+        for romaji in list(romkan.ROMKAN_H) + list(romkan.ROMKAN)
+        for char in romaji[:-1]
+    ) | frozenset("'")
+
+
+KANA_REGEXP = re.compile(r"[ぁ-んァ-ン]")
+
+ANSWER_REGEXP = re.compile(r"^[ぁ-んァ-ン,ー]+$")
 
 
 class KanaWordBuilder:
-    """Build a kana word."""
+    """Build a kana word from romaji typed one character at a time.
+
+    Upper case letters are converted to katakana.
+    Lowercase letters are converted to hiragana.
+
+    The romaji is converted syllable by syllable. A syllable is committed
+    with its kana as soon as it cannot change anymore so a key stroke only
+    converts the pending romaji of the current syllable.
+    """
 
     def __init__(self, romaji) -> None:
-        self.romaji = romaji
+        # Committed syllables: (romaji, kana, is upper case)
+        self._syllables = []
+        self._committed_kana = ""
+        self._pending = ""
+        self._pending_upper = False
+        self.add_romaji(romaji)
+
+    @property
+    def romaji(self):
+        """Get the romaji typed so far."""
+        return "".join(romaji for romaji, _, _ in self._syllables) + self._pending
 
     def add_romaji(self, romaji):
         """Add a romaji character to the kana word.
@@ -47,62 +157,237 @@ class KanaWordBuilder:
         Args:
             romaji (str): The romaji character to add.
         """
-        self.romaji += romaji
+        for char in romaji:
+            # Upper case and lowercase letters are converted separately.
+            if self._pending and char.isupper() != self._pending_upper:
+                self._commit()
+            if not self._pending:
+                self._pending_upper = char.isupper()
+            self._pending += char
+            if char.lower() not in syllable_chars():
+                self._commit()
 
     def remove_last_char(self):
         """Remove the last character from the kana word."""
-        last_kana = self.kana[-1]
-        if re.match(r"[ぁ-んァ-ン]", last_kana):
+        if not self._pending and self._syllables:
+            # Reopen the last syllable.
+            romaji, kana, self._pending_upper = self._syllables.pop()
+            self._committed_kana = self._committed_kana[
+                : len(self._committed_kana) - len(kana)
+            ]
+            self._pending = romaji
+            last_kana = kana[-1]
+        else:
+            last_kana = self._pending_kana[-1:]
+
+        if KANA_REGEXP.match(last_kana):
             # Check if the last kana is an hiragana or katakana.
-            last_kana_romaji = romkan.to_roma(last_kana)
-            self.romaji = self.romaji[: -len(last_kana_romaji)]
+            last_kana_romaji = to_roma(last_kana)
+            self._pending = self._pending[: -len(last_kana_romaji)]
         else:
             # Remove the last character.
-            self.romaji = self.romaji[:-1]
+            self._pending = self._pending[:-1]
 
     @property
     def kana(self):
         """Get the kana word. Upper case letters are converted to katakana.
         Lowercase letters are converted to hiragana.
         """
-        _kana = []
-        for s in split_at_uppercase(self.romaji):
-            if s.isupper():
-                # Keep the extra romaji in upper case.
-                _kana.append(romkan.to_katakana(s).upper())
-            else:
-                _kana.append(romkan.to_hiragana(s))
-        return "".join(_kana)
+        return self._committed_kana + self._pending_kana
 
+    @property
+    def _pending_kana(self):
+        """Get the kana of the pending romaji."""
+        _kana = ""
+        if self._pending:
+            _kana = self._convert(self._pending)
+        return _kana
 
-if sys.platform == "win32":
-    from msvcrt import getch  # type: ignore
+    def _convert(self, romaji):
+        """Convert romaji to kana.
+
+        Args:
+            romaji (str): The romaji of the current syllable.
+
+        Returns:
+            str: The kana.
+        """
+        if self._pending_upper:
+            # Keep the extra romaji in upper case.
+            return to_katakana(romaji).upper()
+        return to_hiragana(romaji)
+
+    def _commit(self):
+        """Commit the pending romaji as a syllable."""
+        kana = self._convert(self._pending)
+        self._syllables.append((self._pending, kana, self._pending_upper))
+        self._committed_kana += kana
+        self._pending = ""
+
+
+# Escape sequences sent by the terminal for the special keys.
+ESCAPE_SEQUENCES = {
+    b"\x1b[A": Key.UP,
+    b"\x1b[B": Key.DOWN,
+    b"\x1b[C": Key.RIGHT,
+    b"\x1b[D": Key.LEFT,
+    # Application cursor mode
+    b"\x1bOA": Key.UP,
+    b"\x1bOB": Key.DOWN,
+    b"\x1bOC": Key.RIGHT,
+    b"\x1bOD": Key.LEFT,
+}
+
+# Other control sequences (E.g: F5 or Delete) are read entirely and ignored.
+CSI_REGEXP = re.compile(rb"\x1b\[[0-?]*[ -/]*[@-~]")
+
+# Seconds to wait for the rest of an escape sequence after an escape byte.
+# The escape key alone is returned when nothing follows.
+ESCAPE_TIMEOUT = 0.05
+
+# On Windows, special keys are a prefix followed by a scan code.
+WINDOWS_KEY_PREFIXES = ("\x00", "\xe0")
+WINDOWS_SCAN_CODES = {"H": Key.UP, "P": Key.DOWN, "M": Key.RIGHT, "K": Key.LEFT}
+
+
+def decode_key(buffer: bytes):
+    """Decode the first key of the bytes read from the terminal.
+
+    Args:
+        buffer (bytes): The bytes read from the terminal.
+
+    Returns:
+        Tuple[str, bytes]: The key and the remaining bytes. The key is None
+        when the buffer does not contain a full key yet.
+
+    Examples:
+        >>> decode_key(b"\x1b[Ca")
+        ('right', b'a')
+    """
+    if buffer.startswith(b"\x1b") and len(buffer) > 1:
+        for sequence, key in ESCAPE_SEQUENCES.items():
+            if buffer.startswith(sequence):
+                return key, buffer[len(sequence) :]
+        match = CSI_REGEXP.match(buffer)
+        if match:
+            return match.group().decode("ascii"), buffer[match.end() :]
+        if any(sequence.startswith(buffer) for sequence in ESCAPE_SEQUENCES):
+            return None, buffer
+
+    # Length of the UTF-8 character from its first byte.
+    length = 1
+    if buffer[0] >= 0xF0:
+        length = 4
+    elif buffer[0] >= 0xE0:
+        length = 3
+    elif buffer[0] >= 0xC0:
+        length = 2
+
+    if len(buffer) < length:
+        return None, buffer
+    return buffer[:length].decode("utf-8", errors="replace"), buffer[length:]
 
-else:  # macOS and Linux
-    import termios
-    import tty
 
-    def getch(use_raw_input=True):
-        """Get a character from the user.
+class RawInput:
+    """Read keys from the terminal without waiting for the enter key.
+
+    The terminal mode is changed once when entering the context and
+    restored when leaving it, including when the user presses Ctrl-C.
+
+    Usage:
+        >>> with RawInput() as terminal:
+        ...     key = terminal.read_key()
+    """
+
+    def __init__(self, use_raw_input=True, fd=None):
+        """Initialize the raw input.
 
         Args:
-            use_raw_input (bool): Use raw input.
+            use_raw_input (bool): Use raw mode. Otherwise use cbreak mode
+                which keeps Ctrl-C and the output processing.
+            fd (int): The file descriptor to read. Defaults to stdin.
+        """
+        self.use_raw_input = use_raw_input
+        self.fd = fd
+        self._buffer = b""
+        self._old_settings = None
+        self._old_handler = None
+
+    def __enter__(self):
+        if sys.platform != "win32":
+            if self.fd is None:
+                self.fd = sys.stdin.fileno()
+            if os.isatty(self.fd):
+                self._old_settings = termios.tcgetattr(self.fd)
+                if self.use_raw_input:
+                    tty.setraw(self.fd)
+                else:
+                    tty.setcbreak(self.fd)
+                if threading.current_thread() is threading.main_thread():
+                    self._old_handler = signal.signal(
+                        signal.SIGINT, self._handle_sigint
+                    )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.restore()
+
+    def restore(self):
+        """Restore the terminal mode and the SIGINT handler."""
+        if self._old_settings is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._old_settings)
+            self._old_settings = None
+        if self._old_handler is not None:
+            signal.signal(signal.SIGINT, self._old_handler)
+            self._old_handler = None
+
+    def _handle_sigint(self, signal_received, frame):
+        """Restore the terminal before handling Ctrl-C."""
+        handler = self._old_handler
+        self.restore()
+        if callable(handler):
+            handler(signal_received, frame)
+
+    def read_key(self) -> str:
+        """Read a key.
 
         Returns:
-            str: The character.
+            str: The character typed or the Key of a special key.
+
+        Raises:
+            EOFError: If there is nothing left to read.
         """
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            if use_raw_input:
-                tty.setraw(sys.stdin.fileno())
-            else:
-                tty.setcbreak(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        if sys.platform == "win32":
+            key = msvcrt.getwch()
+            if key in WINDOWS_KEY_PREFIXES:
+                scan_code = msvcrt.getwch()
+                key = WINDOWS_SCAN_CODES.get(scan_code, key + scan_code)
+            return key
 
-        return ch.encode("utf-8")
+        key = None
+        while key is None:
+            if self._buffer == b"\x1b":
+                # The rest of the escape sequence may not be readable yet.
+                ready, _, _ = select.select([self.fd], [], [], ESCAPE_TIMEOUT)
+                if ready:
+                    self._buffer += os.read(self.fd, 1024)
+            if self._buffer:
+                key, self._buffer = decode_key(self._buffer)
+            if key is None:
+                data = os.read(self.fd, 1024)
+                if not data:
+                    raise EOFError
+                self._buffer += data
+        return key
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+else:  # macOS and Linux
+    import select
+    import termios
+    import tty
 
 
 def input_kana(prompt):
@@ -117,31 +402,30 @@ def input_kana(prompt):
         )
 
     kana_word_builder = KanaWordBuilder("")
-    sys.stdout.write(prompt)
-    sys.stdout.flush()
-    while True:
-        ch = getch()
-        if ch == b"\x03":
-            raise KeyboardInterrupt
-
-        key = ord(ch)
-        if key == 13 and re.compile(r"^[ぁ-んァ-ン,ー]+$").match(kana_word_builder.kana):
-            sys.stdout.write("\n")
-            return kana_word_builder.kana
-        # Backspace/Del key erases previous output.
-        elif key in (8, 127):
-            if len(kana_word_builder.kana) > 0:
-                # Erases previous character.
-                kana_word_builder.remove_last_char()
-                sys.stdout.write(f"\r\x1b[K{prompt}{kana_word_builder.kana}")
-                sys.stdout.flush()
-
-        elif 0 <= key <= 31:
-            sys.stdout.write(f"\r\x1b[K{prompt}{kana_word_builder.kana}\a")
-            sys.stdout.flush()
-        else:
-            # Key is part of the password; display the mask character.
-            char = chr(key)
-            kana_word_builder.add_romaji(char)
-            sys.stdout.write(f"\r{prompt}{kana_word_builder.kana}")
-            sys.stdout.flush()
+    write(prompt)
+    with RawInput() as terminal:
+        while True:
+            key = terminal.read_key()
+            if key == "\x03":
+                raise KeyboardInterrupt
+
+            if key == "\r" and ANSWER_REGEXP.match(kana_word_builder.kana):
+                break
+            # Backspace/Del key erases previous output.
+            elif key in ("\x08", "\x7f"):
+                if kana_word_builder.kana:
+                    # Erases previous character.
+                    kana_word_builder.remove_last_char()
+                    write(f"\r\x1b[K{prompt}{kana_word_builder.kana}")
+
+            # Control characters and special keys.
+            elif len(key) > 1 or ord(key) <= 31:
+                write(f"\r\x1b[K{prompt}{kana_word_builder.kana}\a")
+            else:
+                kana_word_builder.add_romaji(key)
+                write(f"\r{prompt}{kana_word_builder.kana}")
+
+    # Written once the terminal is restored: the raw mode does not return the
+    # carriage on a line feed.
+    write("\n")
+    return kana_word_builder.kana
@@ -0,0 +1,254 @@
+"""Draw frames in the terminal with ANSI escape sequences.
+
+A frame is written with a single write. A frame can also be drawn over the
+previous one by rewriting only the lines that changed.
+
+Usage:
+    >>> from hebikani.screen import Screen
+    >>> screen = Screen()
+    >>> screen.draw("Meaning\\n\\nGround")
+    >>> screen.update("Meaning\\n\\nGround, Floor")
+"""
+import os
+import re
+import sys
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import List, Optional
+
+__all__ = ["Screen", "ask", "display_width", "echo", "write"]
+
+# Move the cursor to the top left corner and erase the screen.
+CLEAR = "\x1b[H\x1b[2J"
+
+# Erase from the cursor to the end of the line.
+ERASE_LINE = "\x1b[K"
+
+# Erase from the cursor to the end of the screen.
+ERASE_BELOW = "\x1b[J"
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|\x1b[78]")
+
+# Held by every write to the terminal. The radicals rendered in the background
+# are drawn from a worker thread while the main thread writes the session.
+OUTPUT_LOCK = threading.RLock()
+
+
+def write(text: str, stream=None):
+    """Write to the output at once.
+
+    Args:
+        text (str): The text.
+        stream (TextIO): The output. Defaults to the standard output.
+    """
+    with OUTPUT_LOCK:
+        stream = stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+def echo(*values, sep: str = " ", end: str = "\n"):
+    """Print values to the standard output while holding the output lock.
+
+    Args:
+        values: The values to print.
+        sep (str): The separator between the values.
+        end (str): The text written after the last value.
+    """
+    write(sep.join(str(value) for value in values) + end)
+
+
+def ask(prompt: str) -> str:
+    """Write a prompt and read a line typed by the user.
+
+    Args:
+        prompt (str): The prompt.
+
+    Returns:
+        str: The line without its line break.
+    """
+    write(prompt)
+    return input()
+
+
+def move_to(row: int) -> str:
+    """Get the escape sequence moving the cursor to the start of a row.
+
+    Args:
+        row (int): The row, starting from 1.
+
+    Returns:
+        str: The escape sequence.
+    """
+    return f"\x1b[{row};1H"
+
+
+@lru_cache(maxsize=1024)
+def display_width(line: str) -> int:
+    """Get the number of columns used by a line in the terminal. The escape
+    sequences are ignored and the wide characters (e.g: kanji) use two
+    columns.
+
+    Args:
+        line (str): The line.
+
+    Returns:
+        int: The number of columns.
+    """
+    return sum(
+        2 if unicodedata.east_asian_width(c) in "WF" else 1
+        for c in ANSI_ESCAPE.sub("", line)
+    )
+
+
+def terminal_size() -> Optional[os.terminal_size]:
+    """Get the size of the terminal.
+
+    Returns:
+        os.terminal_size: The size or None if the output is not a terminal.
+    """
+    try:
+        return os.get_terminal_size()
+    except OSError:
+        return None
+
+
+class Screen:
+    """The terminal screen. It remembers the last frame drawn to redraw only
+    the lines that changed."""
+
+    def __init__(self, stream=None):
+        """Initialize the screen.
+
+        Args:
+            stream (TextIO): The output. Defaults to the standard output.
+        """
+        self.stream = stream
+        self._lines = None
+        self._rows = None
+        self._columns = None
+
+    def _write(self, text: str):
+        """Write to the output at once.
+
+        Args:
+            text (str): The text.
+        """
+        write(text, self.stream)
+
+    def clear(self):
+        """Erase the screen and move the cursor to the top left corner."""
+        with OUTPUT_LOCK:
+            self._lines = None
+            self._write(CLEAR)
+
+    def invalidate(self):
+        """Forget the last frame. Used when something else was drawn on the
+        screen so the next frame is fully drawn."""
+        with OUTPUT_LOCK:
+            self._lines = None
+
+    def draw(self, frame: str):
+        """Erase the screen and draw a frame.
+
+        Args:
+            frame (str): The frame.
+        """
+        with OUTPUT_LOCK:
+            self._remember(frame.split("\n"), terminal_size())
+            self._write(CLEAR + frame)
+
+    def draw_at(self, text: str, row: int):
+        """Draw a text over the frame from a row without moving the cursor.
+        The next frame is fully drawn. Can be called from any thread.
+
+        Nothing is drawn when the last frame did not fit in the terminal: it
+        scrolled so its rows are unknown.
+
+        Args:
+            text (str): The text.
+            row (int): The first row of the text, starting from 1.
+        """
+        lines = "".join(
+            move_to(row + i) + line for i, line in enumerate(text.split("\n"))
+        )
+        size = terminal_size()
+        with OUTPUT_LOCK:
+            fits = self._lines is not None and (
+                size is None
+                or (self._columns == size.columns and sum(self._rows) <= size.lines)
+            )
+            self._lines = None
+            if fits:
+                self._write(f"\x1b7{lines}\x1b8")
+
+    def update(self, frame: str):
+        """Draw a frame over the last one. Only the lines that changed are
+        rewritten. The frame is fully drawn when the last frame is unknown,
+        when the terminal was resized or when the frames do not fit in the
+        terminal.
+
+        Args:
+            frame (str): The frame.
+        """
+        with OUTPUT_LOCK:
+            self._update(frame)
+
+    def _update(self, frame: str):
+        """Draw a frame over the last one while holding the output lock.
+
+        Args:
+            frame (str): The frame.
+        """
+        size = terminal_size()
+        if (
+            size is None
+            or self._lines is None
+            or self._columns != size.columns
+            or sum(self._rows) > size.lines
+        ):
+            self.draw(frame)
+            return
+
+        old_lines, old_rows = self._lines, self._rows
+        lines = frame.split("\n")
+        self._remember(lines, size)
+        if sum(self._rows) > size.lines:
+            self.draw(frame)
+            return
+
+        output = []
+        row = 1
+        for i, line in enumerate(lines):
+            if i >= len(old_lines) or old_rows[i] != self._rows[i]:
+                # The next lines move: they are all drawn again.
+                output.append(move_to(row) + ERASE_BELOW + "\n".join(lines[i:]))
+                break
+            # The last line is always written to leave the cursor at its end.
+            if line != old_lines[i] or i == len(lines) - 1:
+                output.append(move_to(row) + line + ERASE_LINE)
+            row += self._rows[i]
+        else:
+            if len(old_lines) > len(lines):
+                output.append(ERASE_BELOW)
+
+        self._write("".join(output))
+
+    def _remember(self, lines: List[str], size: Optional[os.terminal_size]):
+        """Remember the lines of the frame drawn and the number of rows they
+        use in the terminal.
+
+        Args:
+            lines (List[str]): The lines.
+            size (os.terminal_size): The size of the terminal, if known.
+        """
+        self._lines = lines
+        self._columns = size.columns if size else None
+        if size is None:
+            self._rows = [1] * len(lines)
+        else:
+            # A line longer than the terminal wraps on several rows.
+            self._rows = [
+                max(1, -(-display_width(line) // size.columns)) for line in lines
+            ]
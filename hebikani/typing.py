@@ -48,3 +48,40 @@ class VoiceMode(enumerate):
     RANDOM = "random"
     FEMALE = "female"
     MALE = "male"
+
+
+class ReviewOrder(enumerate):
+    """Order of the subjects in a review session."""
+
+    RANDOM = "random"
+    SRS = "srs"  # lowest SRS stage first
+    LEVEL = "level"  # lowest level first
+    BACK_TO_BACK = "back-to-back"  # the reading right after the meaning
+    OLDEST = "oldest"  # available for the longest time first
+    TYPE = "type"  # radicals, then kanji, then vocabulary
+
+
+class MarkupMode(enumerate):
+    """Output of the WaniKani markup rendering."""
+
+    ANSI = "ansi"  # colored with escape sequences
+    PLAIN = "plain"  # marked with brackets
+    STRIPPED = "stripped"  # text only
+
+
+class Key(enumerate):
+    """Special keys read from the terminal."""
+
+    UP = "up"
+    DOWN = "down"
+    RIGHT = "right"
+    LEFT = "left"
+
+
+class PlayerCommand(enumerate):
+    """Commands of the audio player."""
+
+    PLAY = "play"
+    STOP = "stop"
+    REPLAY = "replay"
+    SHUTDOWN = "shutdown"
@@ -1145,3 +1145,28 @@ subject_water_vocabulary = {
         "spaced_repetition_system_id": 2,
     },
 }
+
+get_study_materials = {
+    "object": "collection",
+    "url": "https://api.wanikani.com/v2/study_materials",
+    "pages": {"per_page": 500, "next_url": None, "previous_url": None},
+    "total_count": 1,
+    "data_updated_at": "2018-04-11T00:00:00.000000Z",
+    "data": [
+        {
+            "id": 65231,
+            "object": "study_material",
+            "url": "https://api.wanikani.com/v2/study_materials/65231",
+            "data_updated_at": "2018-04-11T00:00:00.000000Z",
+            "data": {
+                "created_at": "2018-04-11T00:00:00.000000Z",
+                "subject_id": 440,
+                "subject_type": "kanji",
+                "meaning_note": "I like turtles",
+                "reading_note": "I like durtles",
+                "meaning_synonyms": ["Uno", "Single"],
+                "hidden": False,
+            },
+        }
+    ],
+}
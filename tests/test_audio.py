@@ -0,0 +1,257 @@
+import os
+import threading
+import time
+
+import requests
+from hebikani.audio import (
+    MAX_LATENCIES,
+    AudioBufferPool,
+    AudioCache,
+    AudioPlayer,
+    AudioPrefetcher,
+)
+
+
+def test_put_and_path(tmp_path):
+    """Audios are stored in files named after their content."""
+    cache = AudioCache(str(tmp_path / "audio"))
+    assert cache.path("https://a.mp3") is None
+
+    path = cache.put("https://a.mp3", b"test", ".mp3")
+    assert os.path.basename(path).endswith(".mp3")
+    assert cache.path("https://a.mp3") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"test"
+    assert cache.stats == {"hits": 1, "misses": 1, "files": 1, "bytes": 4}
+
+
+def test_same_content_shares_file(tmp_path):
+    """Two URLs with the same content use the same file."""
+    cache = AudioCache(str(tmp_path))
+    path = cache.put("https://a.mp3", b"test", ".mp3")
+    assert cache.put("https://b.mp3", b"test", ".mp3") == path
+    assert len(cache) == 2
+    assert cache.size == 4
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used audios are deleted when the cache is full."""
+    cache = AudioCache(str(tmp_path), max_size=8)
+    path_a = cache.put("https://a.mp3", b"aaaa", ".mp3")
+    path_b = cache.put("https://b.mp3", b"bbbb", ".mp3")
+    # "a" becomes the most recently used audio.
+    cache.path("https://a.mp3")
+    cache.put("https://c.mp3", b"cccc", ".mp3")
+
+    assert list(cache.keys()) == ["https://a.mp3", "https://c.mp3"]
+    assert os.path.exists(path_a)
+    assert not os.path.exists(path_b)
+    assert cache.size == 8
+
+
+def test_pinned_audios(tmp_path):
+    """Pinned audios are never evicted and do not count in the size limit."""
+    cache = AudioCache(str(tmp_path), max_size=4)
+    path_a = cache.put("https://a.mp3", b"aaaa", ".mp3", pinned=True)
+    cache.put("https://b.mp3", b"bbbb", ".mp3")
+    cache.put("https://c.mp3", b"cccc", ".mp3")
+    assert cache.pin("https://c.mp3") is True
+    assert cache.pin("https://b.mp3") is False
+    cache.put("https://d.mp3", b"dddd", ".mp3")
+
+    assert cache.keys() == ["https://a.mp3", "https://c.mp3", "https://d.mp3"]
+    assert os.path.exists(path_a)
+
+    cache = AudioCache(str(tmp_path), max_size=4)
+    assert cache.keys() == ["https://a.mp3", "https://c.mp3", "https://d.mp3"]
+    assert cache.size == 12
+
+
+def test_index_persistence(tmp_path):
+    """The index is loaded from the disk and ignores deleted files."""
+    cache = AudioCache(str(tmp_path))
+    path_a = cache.put("https://a.mp3", b"aaaa", ".mp3")
+    cache.put("https://b.mp3", b"bbbb", ".mp3")
+    os.unlink(path_a)
+
+    cache = AudioCache(str(tmp_path))
+    assert "https://a.mp3" not in cache
+    assert "https://b.mp3" in cache
+    assert cache.size == 4
+
+
+def test_clear(tmp_path):
+    """Clearing the cache deletes the files and the index."""
+    cache = AudioCache(str(tmp_path))
+    path = cache.put("https://a.mp3", b"aaaa", ".mp3")
+    cache.clear()
+
+    assert len(cache) == 0
+    assert not os.path.exists(path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_prefetcher_wait():
+    """Waiting for an audio returns once its download is done."""
+    prefetcher = AudioPrefetcher(max_workers=1)
+    downloaded = []
+    prefetcher.prefetch({"https://a.mp3": lambda: downloaded.append("a")})
+    prefetcher.wait("https://a.mp3")
+    assert downloaded == ["a"]
+    assert prefetcher.pending() == 0
+    # Waiting for an audio that is not prefetched does nothing.
+    prefetcher.wait("https://b.mp3")
+    prefetcher.shutdown()
+
+
+def test_prefetcher_cancel():
+    """The downloads of the audios that are not requested anymore are
+    cancelled."""
+    prefetcher = AudioPrefetcher(max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    downloaded = []
+
+    def blocking_download():
+        started.set()
+        release.wait()
+
+    prefetcher.prefetch(
+        {
+            "https://a.mp3": blocking_download,
+            "https://b.mp3": lambda: downloaded.append("b"),
+        }
+    )
+    started.wait()
+    # "b" leaves the queue while "a" is still being downloaded.
+    prefetcher.prefetch({"https://a.mp3": blocking_download})
+    release.set()
+    prefetcher.wait("https://a.mp3")
+    assert downloaded == []
+    prefetcher.shutdown()
+
+
+def test_prefetcher_ignores_failed_download():
+    """A failed download is retried by the caller."""
+    prefetcher = AudioPrefetcher(max_workers=1)
+
+    def failing_download():
+        raise requests.ConnectionError()
+
+    prefetcher.prefetch({"https://a.mp3": failing_download})
+    prefetcher.wait("https://a.mp3")
+    prefetcher.shutdown()
+
+
+class FakeBackend:
+    """Record the played audios. An audio plays until it is stopped."""
+
+    def __init__(self):
+        self.played = []
+        self.contents = []
+        self.playing = threading.Event()
+        self._stop = threading.Event()
+
+    def play(self, path, started, content=None):
+        self._stop.clear()
+        started()
+        self.played.append(path)
+        self.contents.append(content)
+        self.playing.set()
+        self._stop.wait()
+        self.playing.clear()
+
+    def stop(self):
+        self._stop.set()
+
+
+def test_audio_player():
+    """The audios are played one at a time by a single worker thread."""
+    backend = FakeBackend()
+    player = AudioPlayer(backend)
+    player.play("a.mp3")
+    assert backend.playing.wait(1)
+    thread = player._thread
+
+    # Playing another audio interrupts the current one.
+    player.play("b.mp3")
+    player.replay()
+    player.stop()
+    player.shutdown()
+
+    assert not thread.is_alive()
+    assert backend.played[0] == "a.mp3"
+    assert player.stats["plays"] == len(backend.played)
+    assert player.stats["max_latency"] >= player.stats["average_latency"] >= 0
+
+
+def test_audio_player_latencies():
+    """Only the last latencies are kept."""
+    player = AudioPlayer(FakeBackend())
+    player.nb_plays = MAX_LATENCIES + 1
+    player.latencies.extend([1] + [0.5] * MAX_LATENCIES)
+    assert len(player.latencies) == MAX_LATENCIES
+    assert player.stats == {
+        "plays": MAX_LATENCIES + 1,
+        "average_latency": 0.5,
+        "max_latency": 0.5,
+    }
+
+
+def test_audio_player_replay():
+    """Replay plays the last audio again."""
+    backend = FakeBackend()
+    player = AudioPlayer(backend)
+    player.play("a.mp3")
+    assert backend.playing.wait(1)
+    player.replay()
+    for _ in range(100):
+        if len(backend.played) == 2:
+            break
+        time.sleep(0.01)
+    player.shutdown()
+    assert backend.played == ["a.mp3", "a.mp3"]
+
+
+def test_audio_player_stop_before_playback():
+    """A stop sent after the worker took an audio, but before the backend
+    started to play it, stops the playback."""
+    backend = FakeBackend()
+    player = AudioPlayer(backend)
+    finished = threading.Event()
+    play = backend.play
+
+    def stop_then_play(path, started, content=None):
+        player.stop()
+        play(path, started, content)
+        finished.set()
+
+    backend.play = stop_then_play
+    player.play("a.mp3")
+    assert finished.wait(1)
+    player.shutdown()
+    assert backend.played == ["a.mp3"]
+
+
+def test_audio_buffer_pool():
+    """The least recently used audios are dropped from memory."""
+    pool = AudioBufferPool(max_size=8)
+    pool.put("https://a.mp3", b"aaaa")
+    pool.put("https://b.mp3", b"bbbb")
+    assert pool.get("https://a.mp3") == b"aaaa"
+    pool.put("https://c.mp3", b"cccc")
+
+    assert "https://b.mp3" not in pool
+    assert pool.get("https://b.mp3") is None
+    assert len(pool) == 2
+    assert pool.size == 8
+
+
+def test_audio_player_content():
+    """The content of the audio is given to the backend."""
+    backend = FakeBackend()
+    player = AudioPlayer(backend)
+    player.play("a.mp3", b"aaaa")
+    assert backend.playing.wait(1)
+    player.shutdown()
+    assert backend.contents == [b"aaaa"]
@@ -1,39 +1,61 @@
 import argparse
 import datetime
 import os
-import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import pytest
+import requests
 from colorama import Back, Fore, Style
 from freezegun import freeze_time
+from hebikani.audio import AudioBufferPool, AudioCache
 from hebikani.hebikani import (
+    DEFAULT_SECONDS_PER_SUBJECT,
+    MAX_MINUTES,
     MAX_NB_SUJECTS,
+    MAX_WINDOW_SIZE,
     MIN_NB_SUBJECTS,
+    MIN_WINDOW_SIZE,
+    WINDOW_ACCURACY_ANSWERS,
+    WINDOW_SHRINK_ERRORS,
     AnswerManager,
+    Audio,
     Cache,
     Client,
     ClientOptions,
     LessonSession,
     Question,
+    QuestionQueue,
     ReviewSession,
     ReviewUpdate,
     Subject,
     Summary,
     api_request,
-    audio_cache,
+    ascii_renders,
+    ascii_width,
+    check_answers,
+    image_cache,
     chunks,
-    clear_audio_cache,
+    close_audio,
     clear_terminal,
+    level_range_type,
+    minutes_type,
     range_int_type,
     utc_to_local,
     wanikani_tag_to_color,
+    window_size_type,
 )
 from hebikani.typing import (
     AnswerType,
     Gender,
     HTTPMethod,
+    Key,
+    MarkupMode,
     QuestionType,
+    ReviewOrder,
     SubjectObject,
     VoiceMode,
 )
@@ -47,6 +69,7 @@ from .data import (
     get_updated_subjects,
     get_subject_without_utf_entry,
     get_subject_fresh_kanji_vocab,
+    get_study_materials,
     get_summary,
     post_review,
     vocab_katakana_equals_hiragna_subject,
@@ -56,6 +79,27 @@ from .data import (
 )
 
 
+@pytest.fixture(autouse=True)
+def settings_path(tmp_path):
+    """Save the settings of every test in a temporary directory."""
+    Cache.ascii_arts = None
+    with patch(
+        "hebikani.settings.get_settings_path", return_value=str(tmp_path / "settings")
+    ):
+        yield tmp_path / "settings"
+    Cache.ascii_arts = None
+
+
+@pytest.fixture(autouse=True)
+def audio_cache(tmp_path):
+    """Use an empty audio cache in every test."""
+    cache = AudioCache(str(tmp_path / "audio"))
+    with patch("hebikani.hebikani.audio_cache", cache), patch(
+        "hebikani.hebikani.audio_buffers", AudioBufferPool()
+    ):
+        yield cache
+
+
 @patch("requests.put")
 @patch("requests.post")
 @patch("requests.get")
@@ -157,8 +201,154 @@ def test_client_assignment_id_per_subject_id(mock_api_request):
     assert assignment_id == 80463006
 
 
+@patch("os.get_terminal_size", side_effect=OSError)
+@patch(
+    "hebikani.hebikani.render_ascii",
+    side_effect=lambda url, widths: {w: f"ascii art {w}" for w in widths},
+)
+def test_ascii_art_cache(mock_render_ascii, mock_terminal_size, settings_path):
+    """The ascii art of a radical is rendered once and saved on the disk."""
+    subject = Subject(get_subject_without_utf_entry["data"][0])
+    assert subject.characters == "ascii art 64"
+    assert subject.characters == "ascii art 64"
+    mock_render_ascii.assert_called_once_with(subject.image_url, (32, 48, 64, 96))
+
+    # The next session uses the saved ascii art.
+    Cache.ascii_arts = None
+    assert Subject(get_subject_without_utf_entry["data"][0]).ascii == "ascii art 64"
+    mock_render_ascii.assert_called_once()
+    assert os.listdir(settings_path) == ["radicals.json"]
+
+    # Resizing the terminal does not render the image again.
+    mock_terminal_size.side_effect = None
+    mock_terminal_size.return_value = os.terminal_size((40, 24))
+    assert subject.characters == "ascii art 32"
+    mock_terminal_size.return_value = os.terminal_size((200, 60))
+    assert subject.characters == "ascii art 96"
+    mock_render_ascii.assert_called_once()
+
+
+@patch("os.get_terminal_size", side_effect=OSError)
+def test_draw_subject_placeholder(mock_terminal_size, capsys):
+    """A placeholder is drawn until the radical is rendered in the
+    background. The radical is then drawn in place of the placeholder."""
+    rendered = threading.Event()
+
+    def render_ascii(url, widths):
+        rendered.wait(1)
+        return {w: "ascii art" for w in widths}
+
+    subject = Subject(get_subject_without_utf_entry["data"][0])
+    session = ReviewSession(Client(API_KEY), [subject])
+    with patch("hebikani.hebikani.render_ascii", side_effect=render_ascii):
+        session.render_radicals([subject])
+        session.draw_subject("Radical:\n\n", subject)
+        frame = capsys.readouterr().out
+        assert frame.startswith("\x1b[H\x1b[2JRadical:\n\n+---")
+        assert "Loading..." in frame
+        assert len(frame.splitlines()) == 2 + int(64 / 2.2) + 1
+
+        rendered.set()
+        ascii_renders[subject.image_url].result()
+
+    # The callbacks run right after the result is available.
+    for _ in range(100):
+        out = capsys.readouterr().out
+        if out:
+            break
+        time.sleep(0.01)
+    assert out == "\x1b7\x1b[3;1Hascii art\x1b8"
+    assert subject.ascii_ready
+    ascii_renders.clear()
+
+
+@patch("os.get_terminal_size")
+def test_ascii_width(mock_terminal_size):
+    """The widest ascii art fitting the terminal with the header and the
+    prompt is used."""
+    for columns, width in [(20, 32), (32, 32), (60, 48), (80, 64), (120, 96)]:
+        mock_terminal_size.return_value = os.terminal_size((columns, 60))
+        assert ascii_width() == width
+
+    # The height of the terminal limits the width too.
+    for lines, width in [(10, 32), (24, 32), (30, 48), (40, 64), (51, 96)]:
+        mock_terminal_size.return_value = os.terminal_size((120, lines))
+        assert ascii_width() == width
+
+    mock_terminal_size.side_effect = OSError
+    assert ascii_width() == 64
+
+
+@patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch(
+    "hebikani.hebikani.render_svg",
+    side_effect=lambda svg, widths: ({w: "ascii art" for w in widths}, 0.1, 0.2),
+)
+@patch("hebikani.hebikani.requests.get")
+@patch(
+    "hebikani.hebikani.load_settings",
+    side_effect=lambda filename: {
+        "subjects.json": [get_subject_without_utf_entry["data"][0], vocabulary_subject]
+    }.get(filename),
+)
+def test_download_radicals(
+    mock_load_settings, mock_get, mock_render_svg, settings_path, capsys
+):
+    """The radicals without characters are rendered and saved."""
+    mock_get.return_value.content = b"<svg/>"
+    image_cache.clear()
+    client = Client(API_KEY, ClientOptions(download_radicals=True))
+    client._download_radicals()
+
+    radical = Subject(get_subject_without_utf_entry["data"][0])
+    mock_render_svg.assert_called_once_with(b"<svg/>", (32, 48, 64, 96))
+    assert Cache.get_ascii_art(radical.image_url, 32) == "ascii art"
+    assert Cache.get_ascii_art(radical.image_url, 96) == "ascii art"
+    assert os.listdir(settings_path) == ["radicals.json"]
+    assert "rasterize: 0.10s, convert: 0.20s" in capsys.readouterr().out
+
+    # The rendered radicals are skipped.
+    client._download_radicals()
+    mock_render_svg.assert_called_once()
+    image_cache.clear()
+
+
+@patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("hebikani.hebikani.create_spinner")
+@patch("hebikani.hebikani.render_svg")
+@patch("hebikani.hebikani.requests.get")
+@patch(
+    "hebikani.hebikani.load_settings",
+    side_effect=lambda filename: {
+        "subjects.json": [get_subject_without_utf_entry["data"][0]]
+    }.get(filename),
+)
+def test_download_radicals_failed(
+    mock_load_settings, mock_get, mock_render_svg, mock_create_spinner, capsys
+):
+    """A radical failing to render is counted and the other ones are saved.
+    The spinner is stopped even when the rendering is interrupted."""
+    mock_get.return_value.content = b"<svg/>"
+    mock_render_svg.side_effect = ValueError
+    image_cache.clear()
+    client = Client(API_KEY, ClientOptions(download_radicals=True))
+    with patch.object(Cache, "save_ascii_arts") as mock_save_ascii_arts:
+        client._download_radicals()
+        assert "1 radicals failed." in capsys.readouterr().out
+        mock_save_ascii_arts.assert_called_once()
+        mock_create_spinner.return_value.stop.assert_called_once()
+
+        mock_render_svg.side_effect = KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            client._download_radicals()
+        assert mock_save_ascii_arts.call_count == 2
+        assert mock_create_spinner.return_value.stop.call_count == 2
+    image_cache.clear()
+
+
+@patch("os.get_terminal_size", side_effect=OSError)
 @patch("requests.get")
-def test_ascii_art(mock_request_get):
+def test_ascii_art(mock_request_get, mock_terminal_size):
     """Check if the ASCII art is correctly displayed."""
     """Test the ascii art creation when no utf character."""
 
@@ -175,6 +365,10 @@ def test_ascii_art(mock_request_get):
         def json(cls):
             return get_subject_without_utf_entry
 
+        @classmethod
+        def raise_for_status(cls):
+            pass
+
         content = img_f.read()
         status_code = 200
 
@@ -186,6 +380,8 @@ def test_ascii_art(mock_request_get):
 
     # The card front should be the same as the ascii art
     assert subjects[0].characters == ascii_f.read()
+    image_cache.clear()
+    Cache.subjects = {}
 
 
 def test_card_audio_creation():
@@ -247,21 +443,55 @@ def test_review_session_audio_mode(audio_play_mock, input_mock):
 
 
 @patch("hebikani.hebikani.requests.get")
-def test_audio_download(mock_get):
+def test_audio_download(mock_get, audio_cache):
     """Test to download an audio unless it is cached"""
     mock_get.return_value.content = b"test"
     subject = Subject(vocabulary_subject)
-    assert len(audio_cache.keys()) == 0
+    assert len(audio_cache) == 0
     audio = subject.audios[0]
-    audio.download()
-    assert len(audio_cache.keys()) == 1
+    path = audio.download()
+    assert len(audio_cache) == 1
+    assert list(audio_cache.keys()) == [audio.url]
+    with open(path, "rb") as f:
+        assert f.read() == b"test"
+
+    # The second download is a cache hit.
+    assert audio.download() == path
+    mock_get.assert_called_once()
+    assert audio_cache.stats == {"hits": 1, "misses": 1, "files": 1, "bytes": 4}
+
+
+@patch("hebikani.hebikani.requests.get")
+def test_audio_download_error(mock_get, audio_cache):
+    """An error page is not cached as an audio"""
+    mock_get.return_value.raise_for_status.side_effect = requests.HTTPError()
+    audio = Subject(vocabulary_subject).audios[0]
+    with pytest.raises(requests.HTTPError):
+        audio.download()
+    assert len(audio_cache) == 0
 
-    key, val = audio_cache.popitem()
-    assert key == audio.url
-    f = open(val.name, "rb")
-    assert f.readlines() == [b"test"]
-    f.close()
-    os.unlink(val.name)
+
+@patch("hebikani.hebikani.audio_player")
+@patch("hebikani.hebikani.requests.get")
+def test_audio_play_from_memory(mock_get, mock_player):
+    """A downloaded audio is played from memory."""
+    mock_get.return_value.content = b"test"
+    audio = Subject(vocabulary_subject).audios[0]
+    audio.play()
+    mock_player.play.assert_called_once_with(audio.download(), b"test")
+
+
+@patch("hebikani.hebikani.ask")
+@patch("hebikani.hebikani.audio_player")
+def test_review_session_audio_stats(mock_player, mock_ask, capsys):
+    """The playback latencies are displayed at the end of the reviews."""
+    mock_player.stats = {"plays": 3, "average_latency": 0.05, "max_latency": 0.12}
+    ReviewSession(Client(API_KEY), []).start()
+    out = capsys.readouterr().out
+    assert out.endswith(
+        "Reviews are done!\nAudio: 3 plays, started in 50 ms on average "
+        "(120 ms at most).\n"
+    )
 
 
 def test_card_answer():
@@ -501,6 +731,184 @@ def test_review_session():
     assert session.nb_subjects == 10
 
 
+def test_question_queue():
+    """The queue keeps WINDOW_SIZE subjects and is refilled when a subject
+    leaves it."""
+    subjects = deque(Subject(vocabulary_subject) for _ in range(12))
+    queue = QuestionQueue()
+    queue.rebuild(subjects)
+    assert queue.nb_session_subjects == 10
+    assert len(queue) == 20
+    assert len(subjects) == 2
+
+    # Both questions of a subject leave the queue.
+    subject = queue.pop().subject
+    while subject in queue.subjects():
+        question = queue.pop()
+        if question.subject is not subject:
+            queue.append(question)
+    assert queue.nb_session_subjects == 9
+    assert len(queue) == 18
+
+    queue.rebuild(subjects)
+    assert queue.nb_session_subjects == 10
+    assert len(subjects) == 1
+
+
+def test_question_queue_window_size():
+    """The window size limits the number of subjects in the queue."""
+    subjects = deque(Subject(vocabulary_subject) for _ in range(12))
+    queue = QuestionQueue(window_size=4)
+    queue.rebuild(subjects)
+    assert queue.nb_session_subjects == 4
+    assert len(subjects) == 8
+
+    # Answers do not change the size of a fixed window.
+    for _ in range(20):
+        queue.record_answer(True)
+    assert queue.window_size == 4
+
+
+def test_question_queue_adaptive_window():
+    """The window grows when the answers are correct and shrinks after a
+    streak of wrong answers."""
+    queue = QuestionQueue(window_size=5, adaptive=True)
+    for _ in range(WINDOW_ACCURACY_ANSWERS - 1):
+        queue.record_answer(True)
+    assert queue.window_size == 5
+    queue.record_answer(True)
+    assert queue.window_size == 6
+
+    for _ in range(WINDOW_SHRINK_ERRORS - 1):
+        queue.record_answer(False)
+    queue.record_answer(True)
+    for _ in range(WINDOW_SHRINK_ERRORS - 1):
+        queue.record_answer(False)
+    assert queue.window_size == 6
+    queue.record_answer(False)
+    assert queue.window_size == 5
+
+    for _ in range(10 * WINDOW_SHRINK_ERRORS):
+        queue.record_answer(False)
+    assert queue.window_size == MIN_WINDOW_SIZE
+
+
+def test_question_queue_wrap_up():
+    """No subject is added to a queue wrapping up."""
+    subjects = deque(Subject(vocabulary_subject) for _ in range(12))
+    queue = QuestionQueue()
+    queue.rebuild(subjects)
+    queue.wrap_up()
+
+    while queue:
+        queue.pop()
+        queue.rebuild(subjects)
+    assert len(subjects) == 2
+
+
+@patch("builtins.input", side_effect=["", "w", ""])
+def test_review_session_wrap_up(input_mock, capsys):
+    """Typing 'w' after an answer wraps up the review session."""
+    client = Client(API_KEY)
+    session = ReviewSession(client, [Subject(vocabulary_subject)])
+    session.ask_continue()
+    assert not session.queue.wrapping_up
+    session.ask_continue()
+    assert session.queue.wrapping_up
+    capsys.readouterr()
+    session.ask_continue()
+    assert capsys.readouterr().out == "\nPress enter to continue..."
+
+
+@patch("hebikani.hebikani.Session.prefetch_audios")
+def test_review_session_minutes(prefetch_mock):
+    """New subjects are added while the session can end in time."""
+    options = ClientOptions(minutes=5, window_size=30)
+    subjects = [Subject(vocabulary_subject) for _ in range(40)]
+    session = ReviewSession(Client(API_KEY, options), subjects)
+
+    # Before the first subject is done, a subject is expected to take
+    # DEFAULT_SECONDS_PER_SUBJECT seconds.
+    session.started_at = time.monotonic() - 1
+    session.rebuild_queue()
+    assert session.queue.nb_session_subjects == 299 // DEFAULT_SECONDS_PER_SUBJECT
+
+    # 6 subjects in about a minute: 23 subjects fit in the remaining 4 minutes.
+    session.started_at = time.monotonic() - 61
+    session.nb_session_completed_subjects = 6
+    session.rebuild_queue()
+    assert session.queue.nb_session_subjects == 23
+    assert not session.queue.wrapping_up
+
+    # The subjects in the queue take the remaining time: the session wraps up.
+    session.started_at = time.monotonic() - 250
+    session.nb_session_completed_subjects = 5
+    session.rebuild_queue()
+    assert session.queue.wrapping_up
+    assert session.queue.nb_session_subjects == 23
+    assert len(session.subjects) == 17
+
+
+def test_question_queue_back_to_back():
+    """The reading is asked right after the meaning in back-to-back order."""
+    subjects = deque(Subject(vocabulary_subject) for _ in range(5))
+    queue = QuestionQueue(ReviewOrder.BACK_TO_BACK)
+    queue.rebuild(subjects)
+    questions = list(queue)
+    for meaning, reading in zip(questions[::2], questions[1::2]):
+        assert meaning.question_type == QuestionType.MEANING
+        assert reading.subject is meaning.subject
+
+
+@patch(
+    "hebikani.hebikani.api_request",
+    return_value={
+        "pages": {"next_url": None},
+        "data": [
+            {"data": {"subject_id": 2467, "srs_stage": 4, "available_at": "2"}},
+            {"data": {"subject_id": 479, "srs_stage": 1, "available_at": "3"}},
+            {"data": {"subject_id": 2547, "srs_stage": 4, "available_at": "1"}},
+            {"data": {"subject_id": 8769, "srs_stage": 2, "available_at": "4"}},
+        ],
+    },
+)
+def test_order_subjects(mock_api_request):
+    """The subjects of a review session are sorted with the review order."""
+    vocabulary = Subject(vocabulary_subject)  # level 1
+    kanji = Subject(subject_water_kanji)  # level 2
+    vocabulary_2 = Subject(subject_water_vocabulary)  # level 2
+    radical = Subject(get_subject_without_utf_entry["data"][0])  # level 5
+    subjects = [vocabulary, kanji, vocabulary_2, radical]
+    client = Client(API_KEY)
+
+    expected_orders = {
+        ReviewOrder.RANDOM: [vocabulary, kanji, vocabulary_2, radical],
+        ReviewOrder.LEVEL: [vocabulary, kanji, vocabulary_2, radical],
+        ReviewOrder.TYPE: [radical, kanji, vocabulary, vocabulary_2],
+        ReviewOrder.SRS: [kanji, radical, vocabulary_2, vocabulary],
+        ReviewOrder.OLDEST: [vocabulary_2, vocabulary, kanji, radical],
+    }
+    for order, expected_subjects in expected_orders.items():
+        client.options.order = order
+        assert client._order_subjects(subjects) == expected_subjects
+
+    # The assignments are only fetched for the SRS and oldest orders.
+    assert mock_api_request.call_count == 2
+
+
+def test_question_queue_requeue():
+    """A question put back in the queue is never the next one."""
+    subjects = deque(Subject(vocabulary_subject) for _ in range(3))
+    queue = QuestionQueue()
+    queue.rebuild(subjects)
+    for _ in range(20):
+        question = queue.pop()
+        queue.requeue(question)
+        assert next(iter(queue)) is not question
+        assert len(queue) == 6
+        assert queue.nb_session_subjects == 3
+
+
 def test_mnemonics():
     """Test the mnemonics."""
     subject = Subject(vocabulary_subject)
@@ -540,6 +948,30 @@ def test_wanikani_tag_to_color():
     assert wanikani_tag_to_color(text) == result
 
 
+def test_wanikani_tag_to_color_nested_tags():
+    """The color of the outer tag is restored after a nested tag and the
+    unknown tags are removed."""
+    open_kanji = Style.BRIGHT + Fore.WHITE + Back.RED
+    open_ja = Style.BRIGHT + Fore.WHITE + Back.GREEN
+    reset = Back.RESET + Fore.RESET + Style.RESET_ALL
+
+    text = "<kanji>a <ja>b</ja> c</kanji> <b>d</b>"
+    assert wanikani_tag_to_color(text) == (
+        f"{open_kanji}a {open_ja}b{open_kanji} c{reset} d"
+    )
+
+    # An unclosed tag is reset at the end and an unopened one is ignored.
+    assert wanikani_tag_to_color("</ja><kanji>a") == f"{open_kanji}a{reset}"
+
+
+def test_wanikani_tag_to_color_modes():
+    """The tagged text can be put between brackets or left as is."""
+    text = "This <kanji>is</kanji> a <radical><i>test</i></radical>."
+    assert wanikani_tag_to_color(text, MarkupMode.PLAIN) == "This [is] a [test]."
+    assert wanikani_tag_to_color(text, MarkupMode.STRIPPED) == "This is a test."
+    assert wanikani_tag_to_color("<ja>a", MarkupMode.PLAIN) == "[a]"
+
+
 def test_chunks():
     """It should divided array into chuncks
 
@@ -551,20 +983,51 @@ def test_chunks():
     assert list(chunks([1, 2, 3, 4, 5, 6], 3)) == [[1, 2, 3], [4, 5, 6]]
 
 
-@patch("os.name", "nt")
 @patch("os.system")
-def test_clear_terminal_windows(os_system):
-    """It should clear the terminal in windows"""
+def test_clear_terminal(os_system, capsys):
+    """It should clear the terminal with escape sequences, without running
+    a command"""
     clear_terminal()
-    os_system.assert_called_with("cls")
+    assert capsys.readouterr().out == "\x1b[H\x1b[2J"
+    os_system.assert_not_called()
 
 
-@patch("os.name", "posix")
-@patch("os.system")
-def test_clear_terminal_posix(os_system):
-    """It should clear the terminal in linux/mac"""
-    clear_terminal()
-    os_system.assert_called_with("clear")
+def test_argparse_level_range_type():
+    """Validate a range of levels"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=level_range_type)
+
+    assert parser.parse_args(["--levels", "1-10"]).levels == (1, 10)
+    assert parser.parse_args(["--levels", "5"]).levels == (5, 5)
+
+    for levels in ["0-10", "10-1", "1-61", "a-b", "1-"]:
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--levels", levels])
+
+
+def test_argparse_window_size_type():
+    """Validate the window size"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window", type=window_size_type)
+
+    assert parser.parse_args(["--window", str(MIN_WINDOW_SIZE)]).window == 3
+    assert parser.parse_args(["--window", str(MAX_WINDOW_SIZE)]).window == 30
+
+    for window in [str(MIN_WINDOW_SIZE - 1), str(MAX_WINDOW_SIZE + 1), "a"]:
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--window", window])
+
+
+def test_argparse_minutes_type():
+    """Validate the duration of a session"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=minutes_type)
+
+    assert parser.parse_args(["--minutes", "15"]).minutes == 15
+
+    for minutes in ["0", str(MAX_MINUTES + 1), "a"]:
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--minutes", minutes])
 
 
 def test_argparse_range_int_type():
@@ -601,25 +1064,15 @@ def test_argparse_range_int_type():
         parser.parse_args(["--limit", "test"])
 
 
-def test_clear_audio_cache():
-    """It should clear the audio cache"""
-    assert len(audio_cache) == 0
-
-    # Create some fake files. It does not need to be a mp3 file.
-    f = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-    f.write(b"test")
-    f.seek(0)
-    f.close()
-    audio_cache["test"] = f
-    assert len(audio_cache) == 1
-
-    # File should exist
-    assert os.path.isfile(f.name) is True
-
-    clear_audio_cache()
+def test_close_audio(audio_cache):
+    """The audio cache is kept between sessions."""
+    path = audio_cache.put("test", b"test", ".mp3", save=False)
+    audio_cache.path("test")
+    close_audio()
 
-    # File should be deleted
-    assert os.path.isfile(f.name) is False
+    cache = AudioCache(audio_cache.directory)
+    assert cache.path("test") == path
+    assert os.path.isfile(path) is True
 
 
 @freeze_time("2018-04-11T00:00:00.000000+00:00", tz_offset=+8)
@@ -662,6 +1115,39 @@ def test_lesson_tab_composition(mock_subject_per_ids):
     )
 
 
+@patch("os.get_terminal_size", side_effect=OSError)
+@patch("hebikani.hebikani.render_ascii")
+@patch(
+    "hebikani.hebikani.Client._subject_per_ids",
+    return_value=[Subject(get_subject_without_utf_entry["data"][0])],
+)
+def test_lesson_tab_composition_placeholder(
+    mock_subject_per_ids, mock_render_ascii, mock_terminal_size
+):
+    """A component radical not rendered yet is replaced by its placeholder
+    instead of being rendered on the main thread."""
+    client = Client(API_KEY)
+    subject = Subject(vocabulary_subject)
+    session = LessonSession(client, [subject])
+    radical = mock_subject_per_ids.return_value[0]
+    assert session.tab_composition(subject).startswith(
+        f"This vocabulary is made of 1 radical:\n- {radical.ascii_placeholder}: "
+    )
+    mock_render_ascii.assert_not_called()
+
+
+def test_ascii_arts_threads(settings_path):
+    """The ascii arts are saved while other threads add ascii arts."""
+    with ThreadPoolExecutor(4) as executor:
+        for future in [
+            executor.submit(Cache.set_ascii_art, f"https://{i}.svg", 32, "art")
+            for i in range(200)
+        ]:
+            future.result()
+    Cache.ascii_arts = None
+    assert len(Cache._load_ascii_arts()) == 200
+
+
 def test_lesson_tab_meaning():
     """Test the tab meaning display"""
     client = Client(API_KEY)
@@ -692,6 +1178,30 @@ def test_lesson_tab_reading(mock_play):
     )
 
 
+@patch("hebikani.hebikani.Audio.play")
+@patch("hebikani.hebikani.RawInput")
+@patch(
+    "hebikani.hebikani.Client._subject_per_ids",
+    return_value=[Subject(get_specific_subjects["data"][0])],
+)
+def test_lesson_interface(mock_subject_per_ids, mock_raw_input, mock_play, capsys):
+    """The tabs are rendered once and the audio is played when the reading
+    tab is shown for the first time."""
+    keys = [Key.RIGHT, Key.RIGHT, Key.LEFT, Key.RIGHT, Key.RIGHT, "\n"]
+    terminal = mock_raw_input.return_value.__enter__.return_value
+    terminal.read_key.side_effect = keys
+    subject = Subject(vocabulary_subject)
+    session = LessonSession(Client(API_KEY), [subject])
+
+    with patch.object(session, "tab_meaning", wraps=session.tab_meaning) as meaning:
+        session.lesson_interface(subject)
+    meaning.assert_called_once()
+    mock_subject_per_ids.assert_called_once()
+    mock_play.assert_called_once()
+    assert len(session.tab_frames[subject.id]) == 4
+    assert "Press directional keys" in capsys.readouterr().out
+
+
 def test_lesson_tab_context():
     """Test the tab context display"""
     client = Client(API_KEY)
@@ -729,7 +1239,11 @@ def test_beautify_tabs_display():
 @patch("hebikani.hebikani.load_settings", return_value={})
 @patch(
     "hebikani.hebikani.api_request",
-    side_effect=[get_specific_subjects, get_specific_subjects_next],
+    side_effect=[
+        get_specific_subjects,
+        get_specific_subjects_next,
+        get_study_materials,
+    ],
 )
 def test_client_dowload_new_data(
     mock_api_request, mock_load_settings, mock_save_settings
@@ -739,15 +1253,21 @@ def test_client_dowload_new_data(
     # Assert value sent to save_settings
     client = Client(API_KEY)
     client.download()
-    args, _ = mock_save_settings.call_args
+    args, _ = mock_save_settings.call_args_list[0]
     filename, subjects = args
     assert filename == "subjects.json"
     assert len(subjects) == 2
 
+    # Study materials are downloaded after the subjects
+    args, _ = mock_save_settings.call_args_list[1]
+    filename, study_materials = args
+    assert filename == "study_materials.json"
+    assert study_materials[0]["data"]["meaning_synonyms"] == ["Uno", "Single"]
+
 
 @patch("hebikani.hebikani.save_settings")
 @patch("hebikani.hebikani.load_settings", return_value={})
-@patch("hebikani.hebikani.api_request", side_effect=[get_specific_subjects_next])
+@patch("hebikani.hebikani.api_request", side_effect=[get_specific_subjects_next, None])
 def test_client_dowload_new_data_only_one_page(
     mock_api_request, mock_load_settings, mock_save_settings
 ):
@@ -764,7 +1284,7 @@ def test_client_dowload_new_data_only_one_page(
 
 @patch(
     "hebikani.hebikani.setting_creation_date",
-    side_effect=[None, datetime.datetime.now()],
+    side_effect=[None, None, datetime.datetime.now(), datetime.datetime.now()],
 )
 @patch("hebikani.hebikani.save_settings")
 @patch("hebikani.hebikani.load_settings", return_value={})
@@ -773,7 +1293,9 @@ def test_client_dowload_new_data_only_one_page(
     side_effect=[
         get_specific_subjects,
         get_specific_subjects_next,
+        None,
         get_updated_subjects,
+        None,
     ],
 )
 def test_client_download_updated_subject(
@@ -802,7 +1324,7 @@ def test_client_download_updated_subject(
 
 @patch(
     "hebikani.hebikani.setting_creation_date",
-    side_effect=[None, datetime.datetime.now()],
+    side_effect=[None, None, datetime.datetime.now(), datetime.datetime.now()],
 )
 @patch("hebikani.hebikani.save_settings")
 @patch("hebikani.hebikani.load_settings", return_value={})
@@ -811,7 +1333,9 @@ def test_client_download_updated_subject(
     side_effect=[
         get_specific_subjects,
         get_specific_subjects_next,
+        None,
         {},
+        None,
     ],
 )
 def test_client_download_no_updated_subject(
@@ -837,3 +1361,306 @@ def test_client_download_no_updated_subject(
     assert len(subjects) == 2
     assert subjects[0]["data"]["meanings"][0]["meaning"] == "one"
     assert subjects[1]["data"]["meanings"][0]["meaning"] == "Two"
+
+
+@patch(
+    "hebikani.hebikani.load_settings",
+    side_effect=[get_study_materials["data"], get_specific_subjects["data"]],
+)
+def test_load_subject_cache_with_study_materials(mock_load_settings):
+    """User synonyms from the study materials should be accepted meanings."""
+    client = Client(API_KEY)
+    client._load_subject_cache()
+    subject = Cache.get_subject(440)
+    assert subject.meaning_synonyms == ["Uno", "Single"]
+    assert subject.meanings.solve("one") == AnswerType.CORRECT
+    assert subject.meanings.solve("uno") == AnswerType.CORRECT
+    assert subject.meanings.solve("Single") == AnswerType.CORRECT
+    assert subject.meanings.primary.value == "one"
+    assert subject.meaning_question.answer_values == "one, uno, single"
+    Cache.subjects = {}
+    Cache.meaning_synonyms = {}
+
+
+def test_check_answers():
+    """Check a batch of answers against the cache."""
+    kanji, vocabulary = [Subject(s) for s in get_subject_fresh_kanji_vocab["data"]]
+    Cache.set_subject(kanji)
+    Cache.set_subject(vocabulary)
+
+    answers = [
+        (kanji.id, QuestionType.MEANING, "Life"),
+        (kanji.id, QuestionType.MEANING, " life "),
+        (kanji.id, QuestionType.MEANING, "Fresh"),
+        (vocabulary.id, QuestionType.MEANING, "Life"),
+        (vocabulary.id, QuestionType.MEANING, "fresh"),
+        (kanji.id, QuestionType.READING, "せい"),
+    ]
+    assert check_answers(answers) == [
+        AnswerType.CORRECT,
+        AnswerType.CORRECT,
+        AnswerType.INCORRECT,
+        AnswerType.INEXACT,
+        AnswerType.CORRECT,
+        AnswerType.CORRECT,
+    ]
+    assert check_answers(iter([])) == []
+    Cache.subjects = {}
+
+
+@patch("hebikani.hebikani.api_request", return_value=get_specific_subjects)
+def test_check_answers_fetch_missing_subjects(mock_api_request):
+    """Missing subjects are fetched once for the whole batch."""
+    Client(API_KEY)
+    answers = [(440, QuestionType.READING, "いち")] * 1000
+    assert check_answers(answers) == [AnswerType.CORRECT] * 1000
+    mock_api_request.assert_called_once()
+    Cache.subjects = {}
+
+
+@patch(
+    "hebikani.hebikani.api_request",
+    return_value={"data": [get_subject_fresh_kanji_vocab["data"][0]]},
+)
+def test_check_answers_fetch_auxiliary_subjects(mock_api_request):
+    """The kanji of a single kanji vocabulary is fetched with the batch so
+    its answers are inexact."""
+    kanji_data, vocabulary_data = get_subject_fresh_kanji_vocab["data"]
+    Client(API_KEY)
+    Cache.set_subject(Subject(vocabulary_data))
+    answers = [(vocabulary_data["id"], QuestionType.MEANING, "Life")] * 10
+    assert check_answers(answers) == [AnswerType.INEXACT] * 10
+    mock_api_request.assert_called_once()
+    assert mock_api_request.call_args.args[1].endswith(f"ids={kanji_data['id']}")
+    Cache.subjects = {}
+
+
+def test_auxiliary_subject_not_found():
+    """A kanji missing from the cache is looked up again later."""
+    kanji_data, vocabulary_data = get_subject_fresh_kanji_vocab["data"]
+    vocabulary = Subject(vocabulary_data)
+    with patch.object(Cache, "client", None):
+        assert vocabulary.auxiliary_subject is None
+        Cache.set_subject(Subject(kanji_data))
+        assert vocabulary.auxiliary_subject.id == kanji_data["id"]
+    assert Question(vocabulary, QuestionType.MEANING).solve("Life") == (
+        AnswerType.INEXACT
+    )
+    Cache.subjects = {}
+
+
+def test_check_answers_radical_reading():
+    """Radicals do not have reading questions."""
+    subject = Subject(get_subject_without_utf_entry["data"][0])
+    Cache.set_subject(subject)
+    with pytest.raises(ValueError):
+        check_answers([(subject.id, QuestionType.READING, "いち")])
+    Cache.subjects = {}
+
+
+def test_check_answers_unknown_subject():
+    """An unknown subject is reported when there is no client to fetch it."""
+    with patch.object(Cache, "client", None), patch.object(Cache, "subjects", {}):
+        with pytest.raises(ValueError, match="Unknown subject 440"):
+            check_answers([(440, QuestionType.MEANING, "One")])
+
+
+@patch(
+    "hebikani.hebikani.api_request",
+    return_value={"data": [get_subject_fresh_kanji_vocab["data"][0]]},
+)
+def test_prepare_session_auxiliary_subject(mock_api_request):
+    """The kanji of a single kanji vocabulary is fetched before the session."""
+    kanji_data, vocabulary_data = get_subject_fresh_kanji_vocab["data"]
+    vocabulary = Subject(vocabulary_data)
+    kanji = Subject(kanji_data)
+    assert vocabulary.auxiliary_subject_id == kanji.id
+    assert kanji.auxiliary_subject_id is None
+
+    client = Client(API_KEY, ClientOptions(silent=True))
+    client._prepare_session([vocabulary, kanji])
+    mock_api_request.assert_called_once()
+    assert vocabulary.auxiliary_subject.id == kanji.id
+    assert kanji.auxiliary_subject is None
+
+    # Checking answers does not use the cache nor the API anymore.
+    Cache.subjects = {}
+    question = Question(vocabulary, QuestionType.MEANING)
+    assert question.solve("Life") == AnswerType.INEXACT
+    question = Question(vocabulary, QuestionType.READING)
+    assert question.solve("せい") == AnswerType.INEXACT
+    mock_api_request.assert_called_once()
+
+
+@patch("hebikani.hebikani.api_request", return_value={"data": [subject_water_kanji]})
+def test_auxiliary_subject_fetched_once(mock_api_request):
+    """A kanji missing from the cache is fetched once when an answer is
+    checked."""
+    Cache.subjects = {}
+    Client(API_KEY)
+    vocabulary = Subject(subject_water_vocabulary)
+    question = Question(vocabulary, QuestionType.READING)
+    assert question.solve("すい") == AnswerType.INEXACT
+    assert vocabulary.auxiliary_subject.id == subject_water_kanji["id"]
+    question.solve("すい")
+    mock_api_request.assert_called_once()
+    Cache.subjects = {}
+
+
+@patch("hebikani.hebikani.requests.get")
+@patch(
+    "hebikani.hebikani.api_request",
+    return_value={"data": [get_subject_without_utf_entry["data"][0]]},
+)
+def test_prepare_session_downloads(mock_api_request, mock_get, audio_cache):
+    """Radical images, components and the first audios are downloaded before a
+    lesson."""
+    mock_get.return_value.content = b"test"
+    image_cache.clear()
+    Cache.subjects = {}
+    subject = Subject(vocabulary_subject)
+    subject.data["data"]["component_subject_ids"] = [8769]
+    options = ClientOptions(voice_mode=VoiceMode.FEMALE)
+    client = Client(API_KEY, options)
+    client._prepare_session([subject], components=True)
+
+    mock_api_request.assert_called_once()
+    radical = Cache.get_subject(8769)
+    assert image_cache[radical.image_url] == b"test"
+    # Audios are downloaded during the session.
+    assert len(audio_cache) == 0
+    assert mock_get.call_count == 1
+
+    # The audios of the first subjects are downloaded with the selected voice.
+    client._prepare_session([subject], components=True, audio_subjects=[subject])
+    female_audios = subject.audios_by_gender[VoiceMode.FEMALE]
+    assert list(audio_cache.keys()) == [female_audios[0].url]
+    assert mock_get.call_count == 2
+
+    # Everything is cached so nothing is downloaded anymore.
+    client._prepare_session([subject], components=True, audio_subjects=[subject])
+    mock_api_request.assert_called_once()
+    assert mock_get.call_count == 2
+
+    subject.data["data"]["component_subject_ids"] = [440]
+    image_cache.clear()
+    Cache.subjects = {}
+
+
+@patch("hebikani.hebikani.create_spinner")
+@patch("hebikani.hebikani.requests.get")
+def test_prepare_session_failed_download(mock_get, mock_create_spinner):
+    """A failed image download is not cached and the spinner is stopped."""
+    mock_get.return_value.raise_for_status.side_effect = requests.HTTPError
+    image_cache.clear()
+    radical = Subject(get_subject_without_utf_entry["data"][0])
+    client = Client(API_KEY, ClientOptions(silent=True))
+    client._prepare_session([radical])
+    assert radical.image_url not in image_cache
+    mock_create_spinner.return_value.stop.assert_called_once()
+
+    mock_create_spinner.reset_mock()
+    with patch.object(client, "_subject_per_ids", side_effect=KeyError):
+        with pytest.raises(KeyError):
+            client._prepare_session([Subject(vocabulary_subject)], components=True)
+    mock_create_spinner.return_value.stop.assert_called_once()
+
+
+@patch("hebikani.hebikani.requests.get")
+def test_prefetch_audios(mock_get, audio_cache):
+    """The audios of the reading questions in the queue are downloaded in the
+    background with the selected voice."""
+    mock_get.return_value.content = b"test"
+    options = ClientOptions(voice_mode=VoiceMode.FEMALE)
+    client = Client(API_KEY, options)
+    subject = Subject(vocabulary_subject)
+    session = ReviewSession(client, [subject])
+    session.queue.rebuild(session.subjects)
+    assert session.queue.reading_subjects() == [subject]
+
+    session.prefetch_audios(session.queue.reading_subjects())
+    audio = session.select_audio(subject)
+    assert audio.download() == audio_cache.path(audio.url)
+    assert list(audio_cache.keys()) == [audio.url]
+    mock_get.assert_called_once_with(audio.url)
+
+
+@patch("hebikani.hebikani.requests.get")
+@patch("hebikani.hebikani.load_settings", return_value=[vocabulary_subject])
+def test_download_audios(mock_load_settings, mock_get, audio_cache):
+    """The audios of the local subjects are downloaded and pinned. Cached
+    audios are not downloaded again."""
+    mock_get.return_value.content = b"test"
+    audio_cache.max_size = 0
+    url = Subject(vocabulary_subject).audios[0].url
+
+    # The subject is not in the requested levels.
+    client = Client(API_KEY, ClientOptions(download_audio=True, levels=(2, 10)))
+    client._download_audios()
+    mock_get.assert_not_called()
+
+    client.options.levels = (1, 10)
+    client._download_audios()
+    mock_get.assert_called_once_with(url)
+    assert audio_cache.keys() == [url]
+
+    # Pinned audios are not evicted.
+    audio_cache.put("https://other.mp3", b"other", ".mp3")
+    assert audio_cache.keys() == [url, "https://other.mp3"]
+    audio_cache.put("https://another.mp3", b"another", ".mp3")
+    assert audio_cache.keys() == [url, "https://another.mp3"]
+
+    # Resume: the downloaded audios are skipped.
+    client._download_audios()
+    mock_get.assert_called_once()
+    assert AudioCache(audio_cache.directory).keys() == [url, "https://another.mp3"]
+
+
+def test_subject_audios_by_gender():
+    """The audios are built once and indexed by gender."""
+    subject = Subject(vocabulary_subject)
+    assert subject.audios is subject.audios
+    assert [a.voice_gender for a in subject.audios_by_gender[Gender.FEMALE]] == [
+        Gender.FEMALE
+    ]
+    assert [a.voice_gender for a in subject.audios_by_gender[Gender.MALE]] == [
+        Gender.MALE
+    ]
+
+
+def test_select_audio_prefers_cached(audio_cache):
+    """An audio already downloaded is preferred for the selected gender."""
+    subject = Subject(vocabulary_subject)
+    female = subject.audios_by_gender[Gender.FEMALE][0]
+    male_actor = Audio(dict(female.data, url="https://male.mp3"))
+    male_actor.data["metadata"] = {"gender": Gender.MALE}
+    other_male_actor = Audio(dict(male_actor.data, url="https://other-male.mp3"))
+    subject._audios_by_gender = {
+        Gender.FEMALE: [female],
+        Gender.MALE: [male_actor, other_male_actor],
+    }
+    audio_cache.put("https://other-male.mp3", b"test", ".mp3")
+
+    session = ReviewSession(Client(API_KEY, ClientOptions()), [subject])
+    session.last_audio_played = female
+    for _ in range(10):
+        assert session.select_audio(subject) is other_male_actor
+
+
+@patch("hebikani.hebikani.SUBJECTS_PER_PAGE", 2)
+@patch(
+    "hebikani.hebikani.api_request",
+    side_effect=lambda method, endpoint, api_key: {
+        "data": [
+            dict(vocabulary_subject, id=int(i))
+            for i in endpoint.split("=")[1].split(",")
+        ]
+    },
+)
+def test_client_subject_per_ids_pages(mock_api_request):
+    """Missing subjects are fetched by pages."""
+    client = Client(API_KEY)
+    subjects = client._subject_per_ids([1, 2, 3, 4, 5])
+    assert [s.id for s in subjects] == [1, 2, 3, 4, 5]
+    assert mock_api_request.call_count == 3
+    Cache.subjects = {}
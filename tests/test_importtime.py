@@ -0,0 +1,23 @@
+from benchmarks.bench_startup import import_times
+
+# Packages only needed to render radicals, play audios or show spinners.
+LAZY_PACKAGES = [
+    "ascii_magic",
+    "cairosvg",
+    "PIL",
+    "playsound",
+    "gi",
+    "halo",
+    "romkan",
+    "pytz",
+    "mutagen",
+    "multiprocessing",
+]
+
+
+def test_lazy_imports():
+    """The CLI starts without importing the packages used by a few commands
+    only."""
+    times = import_times("hebikani.hebikani")
+    assert "hebikani.hebikani" in times
+    assert [m for m in times if m.split(".")[0] in LAZY_PACKAGES] == []
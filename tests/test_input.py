@@ -1,4 +1,11 @@
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
 import hebikani.input as input_kana
+from hebikani.typing import Key
 
 
 def test_kana_builder():
@@ -63,3 +70,129 @@ def test_add_char_to_builder():
 
     word.add_romaji("a")
     assert word.kana == "おはヨYおっは"
+
+
+def test_cached_conversions():
+    """Conversions are cached and shared between the callers."""
+    input_kana.to_roma.cache_clear()
+    assert input_kana.to_roma("ベッドのした") == "beddonoshita"
+    assert input_kana.to_roma("ベッドのした") == "beddonoshita"
+    assert input_kana.to_roma.cache_info().hits == 1
+    assert input_kana.to_hiragana("ohayou") == "おはよう"
+    assert input_kana.to_katakana("sakka-") == "サッカー"
+
+
+def test_split_at_uppercase():
+    """Test splitting the romaji at case changes."""
+    assert input_kana.split_at_uppercase("ITAdaKImasu") == ["ITA", "da", "KI", "masu"]
+    assert input_kana.split_at_uppercase("") == []
+
+
+def test_builder_typed_one_char_at_a_time():
+    """Typing one character at a time gives the same word as converting it."""
+    word = input_kana.KanaWordBuilder("")
+    for char in "nanni,NANI,konnnichiha,kyoushitsu":
+        word.add_romaji(char)
+    assert word.kana == "なんい,ナニ,こんにちは,きょうしつ"
+    assert word.romaji == "nanni,NANI,konnnichiha,kyoushitsu"
+
+
+def test_delete_last_kana_stays_in_syllable():
+    """Deleting a kana only removes the romaji of the last syllable."""
+    # し is typed "si" but its romaji is "shi".
+    word = input_kana.KanaWordBuilder("asi")
+    word.remove_last_char()
+    assert word.kana == "あ"
+
+    # Delete kana until the word is empty.
+    word = input_kana.KanaWordBuilder("kyouTO")
+    for kana in ["きょうト", "きょう", "きょ", ""]:
+        assert word.kana == kana
+        word.remove_last_char()
+    assert word.romaji == ""
+
+
+def test_decode_key():
+    """Test decoding the keys read from the terminal."""
+    assert input_kana.decode_key(b"a") == ("a", b"")
+    assert input_kana.decode_key(b"\x1b[Ca") == (Key.RIGHT, b"a")
+    assert input_kana.decode_key(b"\x1bOD") == (Key.LEFT, b"")
+    assert input_kana.decode_key(b"\x1b") == ("\x1b", b"")
+    assert input_kana.decode_key(b"\x1b[3~") == ("\x1b[3~", b"")
+    # Incomplete keys need more bytes.
+    assert input_kana.decode_key(b"\x1b[") == (None, b"\x1b[")
+    assert input_kana.decode_key("あ".encode()[:2]) == (None, "あ".encode()[:2])
+    assert input_kana.decode_key("あい".encode()) == ("あ", "い".encode())
+
+
+def test_raw_input_read_key():
+    """Keys are decoded from a buffer filled by reading the file descriptor."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"k\x1b[D\x1b[C" + "ー".encode()[:1])
+    with input_kana.RawInput(fd=read_fd) as terminal:
+        assert terminal.read_key() == "k"
+        assert terminal.read_key() == Key.LEFT
+        assert terminal.read_key() == Key.RIGHT
+        os.write(write_fd, "ー".encode()[1:])
+        assert terminal.read_key() == "ー"
+        os.close(write_fd)
+        with pytest.raises(EOFError):
+            terminal.read_key()
+    os.close(read_fd)
+
+
+def test_raw_input_split_escape_sequence():
+    """The rest of an escape sequence read separately is waited for."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"\x1b")
+    timer = threading.Timer(0.01, os.write, (write_fd, b"[Aa"))
+    timer.start()
+    with input_kana.RawInput(fd=read_fd) as terminal:
+        assert terminal.read_key() == Key.UP
+        assert terminal.read_key() == "a"
+        # The escape key alone.
+        os.write(write_fd, b"\x1b")
+        assert terminal.read_key() == "\x1b"
+    timer.join()
+    os.close(write_fd)
+    os.close(read_fd)
+
+
+def test_input_kana():
+    """Test typing an answer with a special key and backspaces."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"nanx\x7f\x1b[A,NANI\r")
+    os.close(write_fd)
+    with patch("sys.stdin") as stdin, patch("sys.stdout"):
+        stdin.fileno.return_value = read_fd
+        assert input_kana.input_kana("reading: ") == "なん,ナニ"
+    os.close(read_fd)
+
+    # The line break is written once the terminal mode is restored.
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"na\r")
+    os.close(write_fd)
+    events = []
+    restore = input_kana.RawInput.restore
+
+    def record_restore(terminal):
+        events.append("restore")
+        restore(terminal)
+
+    with patch("sys.stdin") as stdin, patch("sys.stdout") as stdout, patch.object(
+        input_kana.RawInput, "restore", record_restore
+    ):
+        stdin.fileno.return_value = read_fd
+        stdout.write.side_effect = events.append
+        assert input_kana.input_kana("reading: ") == "な"
+    assert events[-2:] == ["restore", "\n"]
+    os.close(read_fd)
+
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"na\x03")
+    os.close(write_fd)
+    with patch("sys.stdin") as stdin, patch("sys.stdout"):
+        stdin.fileno.return_value = read_fd
+        with pytest.raises(KeyboardInterrupt):
+            input_kana.input_kana("reading: ")
+    os.close(read_fd)
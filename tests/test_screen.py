@@ -0,0 +1,119 @@
+import io
+import os
+import threading
+from unittest.mock import patch
+
+from hebikani.screen import OUTPUT_LOCK, Screen, display_width
+
+
+def test_display_width():
+    """The escape sequences use no column and the kanji use two."""
+    assert display_width("water") == 5
+    assert display_width("\x1b[31mwater\x1b[0m") == 5
+    assert display_width("水") == 2
+    assert display_width("水 - water") == 10
+
+
+def test_draw():
+    """A frame is drawn on a cleared screen with a single write."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+    with patch.object(stream, "write", wraps=stream.write) as write:
+        screen.draw("Meaning\n\nWater")
+    write.assert_called_once_with("\x1b[H\x1b[2JMeaning\n\nWater")
+
+
+@patch("os.get_terminal_size", return_value=os.terminal_size((80, 24)))
+def test_update(mock_terminal_size):
+    """Only the lines that changed are written again. The last line is
+    always written to leave the cursor at the end of the frame."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+    screen.draw("Kanji:\n\n水\n\nMeaning\nWater\n")
+    stream.truncate(0)
+    stream.seek(0)
+
+    screen.update("Kanji:\n\n水\n\nReading\nすい\n")
+    assert stream.getvalue() == (
+        "\x1b[5;1HReading\x1b[K\x1b[6;1Hすい\x1b[K\x1b[7;1H\x1b[K"
+    )
+
+
+@patch("os.get_terminal_size", return_value=os.terminal_size((10, 24)))
+def test_update_moved_lines(mock_terminal_size):
+    """The lines after a line wrapping on a different number of rows are
+    all drawn again."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+    screen.draw("Kanji:\nWater\nEnd")
+    stream.truncate(0)
+    stream.seek(0)
+
+    screen.update("Kanji:\nWater, water, water\nEnd")
+    assert stream.getvalue() == "\x1b[2;1H\x1b[JWater, water, water\nEnd"
+
+    # Fewer lines: the rest of the screen is erased.
+    stream.truncate(0)
+    stream.seek(0)
+    screen.update("Kanji:")
+    assert stream.getvalue() == "\x1b[1;1HKanji:\x1b[K\x1b[J"
+
+
+@patch("os.get_terminal_size")
+def test_update_full_redraw(mock_terminal_size):
+    """The frame is fully drawn when the terminal size is unknown, when the
+    terminal is resized or after the screen is invalidated."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+
+    mock_terminal_size.side_effect = OSError
+    screen.draw("Kanji:")
+    screen.update("Kanji:")
+    assert stream.getvalue().count("\x1b[2J") == 2
+
+    mock_terminal_size.side_effect = None
+    mock_terminal_size.return_value = os.terminal_size((80, 24))
+    screen.update("Kanji:")
+    mock_terminal_size.return_value = os.terminal_size((40, 24))
+    screen.update("Kanji:")
+    assert stream.getvalue().count("\x1b[2J") == 4
+
+    screen.invalidate()
+    screen.update("Kanji:")
+    assert stream.getvalue().count("\x1b[2J") == 5
+
+
+@patch("os.get_terminal_size", return_value=os.terminal_size((80, 24)))
+def test_draw_at(mock_terminal_size):
+    """A text drawn over the frame keeps the cursor in place and the next
+    frame is fully drawn. It waits for the writes of the other threads."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+    screen.draw("Radical:\n\nLoading...\n\nMeaning")
+
+    with OUTPUT_LOCK:
+        thread = threading.Thread(target=screen.draw_at, args=("ascii\nart", 3))
+        thread.start()
+        thread.join(0.05)
+        assert thread.is_alive()
+    thread.join()
+    assert stream.getvalue().endswith("\x1b7\x1b[3;1Hascii\x1b[4;1Hart\x1b8")
+
+    screen.update("Radical:\n\nascii\nart\n\nMeaning")
+    assert stream.getvalue().endswith("\x1b[H\x1b[2JRadical:\n\nascii\nart\n\nMeaning")
+
+
+@patch("os.get_terminal_size", return_value=os.terminal_size((80, 5)))
+def test_draw_at_scrolled_frame(mock_terminal_size):
+    """A text is not drawn over a frame taller than the terminal. The next
+    frame is fully drawn instead."""
+    stream = io.StringIO()
+    screen = Screen(stream)
+    screen.draw("Radical:\n\nLoading...\n\n\n\nMeaning")
+    stream.truncate(0)
+    stream.seek(0)
+
+    screen.draw_at("ascii\nart", 3)
+    assert stream.getvalue() == ""
+    screen.update("Radical:\n\nascii\nart")
+    assert stream.getvalue() == "\x1b[H\x1b[2JRadical:\n\nascii\nart"